@@ -22,6 +22,7 @@ from pmakeup import version
 from pmakeup.models.AttrDict import AttrDict
 from pmakeup.TargetDescriptor import TargetDescriptor
 from pmakeup.platforms.InterestingPath import InterestingPath
+from pmakeup.platforms.TempFilePool import TempFilePool
 
 # main core (order here is REALLY sensitive!)
 
@@ -65,6 +66,8 @@ from pmakeup.plugins.linux.LinuxPMakeupPlugin import LinuxPMakeupPlugin
 
 
 from pmakeup.platforms.IOSSystem import IOSSystem
+from pmakeup.platforms.IOSSystem import USE_FAST_TMP
+from pmakeup.platforms.IOSSystem import cached_stat
 
 import pmakeup.models.PMakeupRegistry
 import pmakeup.platforms.WindowsOSSystem
@@ -91,6 +94,9 @@ from pmakeup.cache.IPMakeupCache import IPMakeupCache
 import pmakeup.cache.JsonPMakeupCache
 from pmakeup.cache.JsonPMakeupCache import JsonPMakeupCache
 
+import pmakeup.cache.MarshalPMakeupCache
+from pmakeup.cache.MarshalPMakeupCache import MarshalPMakeupCache
+
 # ######################################################
 # now import classes (order here is irrelevant)
 # ######################################################
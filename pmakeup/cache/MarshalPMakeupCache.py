@@ -0,0 +1,58 @@
+import marshal
+import os
+from typing import Any, Dict, Iterable
+
+import pmakeup as pm
+
+
+class MarshalPMakeupCache(pm.IPMakeupCache):
+    """
+    A cache stored in a binary file, via the marshal module. It is way faster to load and store than a JSON cache,
+    but the file is not human readable and it can be read only by the same python version that has written it.
+    Only python builtin types (numbers, strings, bytes, lists, tuples, sets, dictionaries, None) can be stored.
+    """
+
+    def __init__(self, file_path: pm.path):
+        self.file_path: pm.path = file_path
+        self.d: Dict[str, Any] = {}
+        # load the cache (if present)
+        if self.is_cache_present():
+            with open(self.file_path, "rb") as f:
+                content = f.read()
+            try:
+                self.d: Dict[str, Any] = marshal.loads(content)
+            except (EOFError, ValueError, TypeError):
+                raise pm.PMakeupException(f"Cannot read the cache {self.get_name()}: was it written by another python version?")
+
+    def reset(self):
+        self.d.clear()
+        self.update_cache()
+
+    def is_empty(self) -> bool:
+        return len(self.d) == 0
+
+    def variable_names(self) -> Iterable[str]:
+        yield from self.d.keys()
+
+    def is_cache_present(self) -> bool:
+        return os.path.exists(self.file_path)
+
+    def get_name(self) -> str:
+        return f"Binary Cache at {os.path.abspath(self.file_path)}"
+
+    def set_variable_in_cache(self, name: str, value: Any, overwrites_is_exists: bool = True):
+        if overwrites_is_exists is False and name in self.d:
+            raise KeyError(f"variable \"{name}\" already exists in the cache {self.get_name()}")
+        self.d[name] = value
+
+    def get_variable_in_cache(self, name: str) -> Any:
+        return self.d[name]
+
+    def has_variable_in_cache(self, name: str) -> bool:
+        return name in self.d
+
+    def update_cache(self):
+        # serialize before opening the file: if a value cannot be stored, we do not truncate the previous cache
+        content = marshal.dumps(self.d)
+        with open(self.file_path, "wb") as f:
+            f.write(content)
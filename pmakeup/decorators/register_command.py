@@ -1,22 +1,14 @@
 import logging
-from functools import wraps
 
 
 def add(group: str = "generic"):
     def decorator(func):
-        @wraps(func)
-        def decorator_wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
-
-        logging.debug("adding function \"{name}\"")
         function_name = func.__name__
-        if function_name not in add.plugins["call_dictionary"]:
-            add.plugins["call_dictionary"][function_name] = {}
+        logging.debug("adding function \"%s\"", function_name)
         add.plugins["call_dictionary"][function_name] = (group, func)
 
-        decorator.__doc__ = func.__doc__
-
-        return decorator_wrapper
+        # the command is only recorded: return the function itself, so calling it does not go through a wrapper
+        return func
 
     if not hasattr(add, "plugins"):
         add.plugins = dict()
@@ -125,6 +125,11 @@ def parse_options(args):
     parser.add_argument("-l", "--log_level", type=str, required=False, default="CRITICAL", help="""
     Log level of the application. Allowed values are "INFO", "DEBUG", "INFO"
     """)
+    parser.add_argument("-c", "--cache_format", type=str, required=False, default="json", choices=["json", "binary"], help="""
+    Format of the cache persisted between different runs. "json" generates a human readable
+    "pmakeup-cache.json" file, "binary" generates "pmakeup-cache.bin", which is faster to read and write but can be
+    read only by the same python version
+    """)
     parser.add_argument("-m", "--python_module", nargs=2, action="append", default=None, help="""
     A python module that the script will load. The first argument represents the name that you will use in the PMakefile
     while the second parameter is the python module to import. For instance --python_module "numpy" "np"
@@ -169,6 +174,7 @@ def initialize_model(options) -> "pm.PMakeupModel":
     model.input_encoding = options.input_encoding
     model.log_level = options.log_level
     model.input_string = options.input_string
+    model.pmake_cache_format = options.cache_format
     model.cli_variables = {x[0]: x[1] for x in options.variable}
     model.requested_target_names = options.targets
     model.should_show_target_help = options.info
@@ -209,8 +215,8 @@ def main(args=None):
         sys.exit(2)
     except pm.PMakeupException as e:
         sys.exit(254)
-    except Exception as e:
-        raise e
+    except Exception:
+        raise
 
 
 if __name__ == "__main__":
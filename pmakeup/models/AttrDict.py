@@ -3,24 +3,33 @@ from typing import Any, Tuple, Iterable
 
 
 class AttrDict(object):
+    """
+    A dictionary whose values can be accessed as attributes as well.
+    The entries live in a private dictionary rather than in the instance __dict__: in this way keys like "keys",
+    "items", "values" or "has_key" can never shadow the methods of this class. __slots__ keeps the lookup of the
+    wrapped dictionary itself cheap
+    """
+
+    __slots__ = ("_d", )
 
     def __init__(self, d):
-        self._d = d
+        object.__setattr__(self, "_d", d)
 
     def __getattr__(self, item: str):
-        if item in ["_d"]:
-            return super(AttrDict, self).__getattribute__(item)
-        else:
-            return super(AttrDict, self).__getattribute__("_d")[item]
+        # invoked only when item is not a method or slot of this class
+        if item == "_d":
+            # the slot has not been set yet (e.g., while copying the object): avoid an infinite recursion
+            raise AttributeError(item)
+        return self._d[item]
 
     def __setattr__(self, key: str, value):
-        if key in ["_d"]:
-            super(AttrDict, self).__setattr__(key, value)
-        else:
-            self._d[key] = value
+        self._d[key] = value
+
+    def __getitem__(self, item: str):
+        return self._d[item]
 
-    __getitem__ = __getattr__
-    __setitem__ = __setattr__
+    def __setitem__(self, key: str, value):
+        self._d[key] = value
 
     def __contains__(self, item) -> bool:
         return item in self._d
@@ -41,4 +50,4 @@ class AttrDict(object):
         yield from self._d.values()
 
     def has_key(self, item: str) -> bool:
-        return item in self
\ No newline at end of file
+        return item in self
@@ -1,8 +1,10 @@
 import abc
+import concurrent.futures
 import datetime
 import importlib
 import inspect
 import itertools
+import locale
 import logging
 import math
 import os
@@ -11,16 +13,31 @@ import re
 import networkx as nx
 import textwrap
 import traceback
-from typing import Any, Dict, Optional, List, Iterable, Union
+import types
+from typing import Any, Dict, Optional, List, Iterable, Union, FrozenSet, Tuple, Mapping
 
 import colorama
 import typing
 import importlib.util
 
-import pkg_resources
-from pkg_resources import EggInfoDistribution
 
 import pmakeup as pm
+import pmakeup.models.PMakeupRegistry
+
+
+_STANDARD_MODULES: Mapping[str, types.ModuleType] = types.MappingProxyType({
+    "math": math,
+    "datetime": datetime,
+    "itertools": itertools,
+    "os": os,
+    "typing": typing,
+})
+"""
+modules that are always available in a PMakefile, indexed by the name they have there
+"""
+for _module_name in _STANDARD_MODULES:
+    if not pmakeup.models.PMakeupRegistry.PMakeupRegistry.can_a_function_have_a_name(_module_name):
+        raise ValueError(f"The standard module cannot have the name {_module_name}!")
 
 
 class PMakeupModel(abc.ABC):
@@ -75,6 +92,11 @@ class PMakeupModel(abc.ABC):
         """
         Cache containing data that the user wants t persist between different pmakeup runs
         """
+        self.pmake_cache_format: str = "json"
+        """
+        Format of ::pmake_cache. "json" stores the cache in a human readable "pmakeup-cache.json" file,
+        "binary" stores it in "pmakeup-cache.bin", which is faster to load and store
+        """
         self._pmakefiles_include_stack: List[pm.path] = []
         """
         Represents the PMakefile pmakeup is handling. Each time we include something, the code within it is executed.
@@ -89,6 +111,16 @@ class PMakeupModel(abc.ABC):
 
         # initialize the container that holds all the functions that can be used inside pmakeup
         self._plugin_graph: nx.DiGraph = nx.DiGraph(name="Plugin graph")
+        self._registered_plugins: Optional[FrozenSet["pm.AbstractPmakeupPlugin"]] = None
+        """
+        The plugins whose functions have been put in ::_eval_globals the last time it was updated.
+        None if the registry has never been updated
+        """
+        self._compiled_pmakefiles: Dict[Tuple[pm.path, int, int], types.CodeType] = {}
+        """
+        The code of the PMakefiles executed so far. Each code is indexed by the absolute path, the modification time
+        and the size of the PMakefile it has been compiled from
+        """
 
     def is_plugin_registered(self, plugin: Union[str, "pm.AbstractPmakeupPlugin"]) -> bool:
         """
@@ -104,7 +136,7 @@ class PMakeupModel(abc.ABC):
         else:
             raise TypeError(f"is_plugin_registered: only str or object is allowed")
 
-        return plugin in set(map(lambda n: n.get_plugin_name(), self._plugin_graph.nodes))
+        return any(n.get_plugin_name() == plugin for n in self._plugin_graph.nodes)
 
     def _ensure_plugin_is_registered(self, plugin: Union[str, "pm.AbstractPmakeupPlugin"]):
         """
@@ -137,7 +169,8 @@ class PMakeupModel(abc.ABC):
         if isinstance(plugin, str):
             plugin_name = plugin
         elif isinstance(plugin, type):
-            plugin_name = plugin(self).get_plugin_name()
+            # same name AbstractPmakeupPlugin::get_plugin_name computes, without creating a throwaway instance
+            plugin_name = plugin.__name__.split(".")[-1]
         else:
             raise TypeError(f"Invalid type when computing get_plugin. plugin is {plugin}")
 
@@ -213,9 +246,12 @@ class PMakeupModel(abc.ABC):
             self._update_eval_global()
 
     def __fetch_pmakeup_plugins_installed(self) -> Iterable[type]:
+        # pkg_resources is really slow to import (it scans all the installed distributions). Import it only if
+        # we need to look for the installed plugins
+        import pkg_resources
 
-        for apackage in map(lambda p: p, pkg_resources.working_set):
-            package: "EggInfoDistribution" = apackage
+        for apackage in pkg_resources.working_set:
+            package: "pkg_resources.EggInfoDistribution" = apackage
 
             if re.search(r"^pmakeup-plugin(s)?-.+", package.project_name) is None and re.search(
                     r".+-pmakeup-plugin(s)?$", package.key) is None:
@@ -262,14 +298,15 @@ class PMakeupModel(abc.ABC):
         ]
 
         # specific operating system
-        if platform.system() == "Windows":
+        system = platform.system()
+        if system == "Windows":
             logging.info(f"Registering operating system plugin {pm.WindowsPMakeupPlugin}")
             plugin_class_to_instantiates.append(pm.WindowsPMakeupPlugin)
-        elif platform.system() == "Linux":
+        elif system == "Linux":
             logging.info(f"Registering operating system plugin {pm.LinuxPMakeupPlugin}")
             plugin_class_to_instantiates.append(pm.LinuxPMakeupPlugin)
         else:
-            raise ValueError(f"Invlaid platform {platform.system()}")
+            raise ValueError(f"Invlaid platform {system}")
 
         # we need to scan all the install packages, fetch hte one insteresting for pmakeup.
         # Then we need to create a plugin per class
@@ -323,13 +360,7 @@ class PMakeupModel(abc.ABC):
         """
         get the modules to always load into the developer
         """
-        return [
-            ("math", math),
-            ("datetime", datetime),
-            ("itertools", itertools),
-            ("os", os),
-            ("typing", typing)
-        ]
+        return _STANDARD_MODULES.items()
 
     def _get_constants_to_add_in_registry(self):
         """
@@ -354,23 +385,47 @@ class PMakeupModel(abc.ABC):
         # ####################################################################################
 
         # Standard constants
-        logging.debug(f"Adding standard constants in the pmakeup registry...")
+        logging.debug("Adding standard constants in the pmakeup registry...")
         for variable_name, value, description in self._get_constants_to_add_in_registry():
             if not self._eval_globals.can_a_function_have_a_name(variable_name):
                 raise ValueError(f"The standard variable cannot have the name {variable_name}!")
             if variable_name not in self._eval_globals.variables:
                 self._eval_globals.variables[variable_name] = value
 
-        logging.debug(f"Adding CWD in the pmakeup registry...")
+        logging.debug("Adding CWD in the pmakeup registry...")
         self._eval_globals.variables.cwd = os.path.abspath(os.curdir)
         # user specific variables: copy both in original_variables and in the actual variables
-        logging.debug(f"Adding user injected variables from CLI in the pmakeup registry '{', '.join(self.cli_variables.keys())}'...")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Adding user injected variables from CLI in the pmakeup registry '%s'...", ', '.join(self.cli_variables.keys()))
         self._eval_globals.pmakeup_original_variables = pm.AttrDict({})
-        logging.debug(f"Adding standard variable 'model'...")
+        logging.debug("Adding standard variable 'model'...")
         self._eval_globals.pmakeup_models = self
-        logging.debug(f"Adding standard variable 'requested_target_names'...")
+        logging.debug("Adding standard variable 'requested_target_names'...")
         self._eval_globals.pmakeup_requested_target_names = self.requested_target_names
 
+        # ####################################################################################
+        # ########################### VARIABLES PASSED BY CLI  ###############################
+        # ####################################################################################
+
+        # copy the variable dict inside the registry and put it in the pmakeup_original_variables
+        logging.debug("CLI variables are %s", self.cli_variables)
+        for variable_name, variable_value in self.cli_variables.items():
+            logging.debug("Trying to add variable %s in the registry...", variable_name)
+            if not self._eval_globals.can_a_function_have_a_name(variable_name):
+                raise ValueError(f"User injected variable cannot have the name {variable_name}!")
+            self._eval_globals.pmakeup_original_variables[variable_name] = self.cli_variables[variable_name]
+            self._eval_globals.pmakeup_cli_variables[variable_name] = self.cli_variables[variable_name]
+            self._eval_globals.variables[variable_name] = self.cli_variables[variable_name]
+            logging.debug("Added variable %s in the registry!", variable_name)
+
+        # the remaining part of the registry (plugins functions, standard modules and interesting paths) depends only
+        # on the plugins loaded so far. execute_string calls us every time (e.g., include_file), so avoid scanning
+        # the plugins and the file system again if no plugin has been registered since the last time
+        plugins = frozenset(self.get_plugins())
+        if plugins == self._registered_plugins:
+            return self._eval_globals
+        self._registered_plugins = plugins
+
         # ####################################################################################
         # ########################### PLUGINS ################################################
         # ####################################################################################
@@ -399,28 +454,11 @@ class PMakeupModel(abc.ABC):
         # ####################################################################################
 
         logging.debug(f"Adding standard modules in the pmakeup registry...")
+        # the names of the standard modules have already been checked at import time
         for module_name, v in self._get_standard_module():
-            if not self._eval_globals.can_a_function_have_a_name(module_name):
-                raise ValueError(f"The standard module cannot have the name {module_name}!")
             if module_name not in self._eval_globals:
-                logging.debug(f"Adding python standard module {module_name}")
                 self._eval_globals[module_name] = v
 
-        # ####################################################################################
-        # ########################### VARIABLES PASSED BY CLI  ###############################
-        # ####################################################################################
-
-        # copy the variable dict inside the registry and put it in the pmakeup_original_variables
-        logging.debug(f"CLI variables are {self.cli_variables}")
-        for variable_name, variable_value in self.cli_variables.items():
-            logging.debug(f"Trying to add variable {variable_name} in the registry...")
-            if not self._eval_globals.can_a_function_have_a_name(variable_name):
-                raise ValueError(f"User injected variable cannot have the name {variable_name}!")
-            self._eval_globals.pmakeup_original_variables[variable_name] = self.cli_variables[variable_name]
-            self._eval_globals.pmakeup_cli_variables[variable_name] = self.cli_variables[variable_name]
-            self._eval_globals.variables[variable_name] = self.cli_variables[variable_name]
-            logging.debug(f"Added variable {variable_name} in the registry!")
-
         # logging.info(f"VARIABLES PASSED FROM CLI")
         # for i, (k, v) in enumerate(self.variable.items()):
         #    logging.info(f' {i}. {k} = {v}')
@@ -439,17 +477,18 @@ class PMakeupModel(abc.ABC):
 
         # DISPLAY SOME INFORMATION
 
-        logging.info(f"INTERESTING PATHS")
-        for i, (k, values) in enumerate(self._eval_globals.pmakeup_interesting_paths.items()):
-            logging.info(f" - {i + 1}. {k}: {', '.join(map(str, values))}")
+        logging.info("INTERESTING PATHS")
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            for i, (k, values) in enumerate(self._eval_globals.pmakeup_interesting_paths.items()):
+                logging.info(" - %d. %s: %s", i + 1, k, ', '.join(map(str, values)))
 
-        logging.info(f"LATEST INTERESTING PATHS")
+        logging.info("LATEST INTERESTING PATHS")
         for i, (k, v) in enumerate(self._eval_globals.pmakeup_interesting_paths.items()):
-            logging.info(f" - {i+1}. {k}: {v}")
+            logging.info(" - %d. %s: %s", i + 1, k, v)
 
-        logging.info(f"USER REQUESTED TARGETS")
+        logging.info("USER REQUESTED TARGETS")
         for i, t in enumerate(self.requested_target_names):
-            logging.info(f" - {i+1}. {t}")
+            logging.info(" - %d. %s", i + 1, t)
 
         return self._eval_globals
 
@@ -497,37 +536,148 @@ class PMakeupModel(abc.ABC):
         :param input_file: file containing the code to execute
         :return:
         """
+        self._execute_loaded_pmakefile(input_file, *self._load_pmakefile(input_file))
+
+    def execute_files(self, input_files: List[pm.path]):
+        """
+        Execute the content of several files, one after the other. The files are read from the disk concurrently,
+        but their code is executed sequentially, in the given order.
+        A file can be generated or modified by the ones executed before it: in this case it is read again right
+        before executing it, so the result is the same of calling ::execute_file on each of them
+
+        :param input_files: files containing the code to execute
+        """
 
-        with open(input_file, "r", encoding=self.input_encoding) as f:
-            input_str = f.read()
+        def prefetch(input_file: pm.path) -> Optional[Tuple[Tuple[pm.path, int, int], Optional[str]]]:
+            try:
+                return self._load_pmakefile(input_file)
+            except OSError:
+                # the file may not exist yet: one of the previous files may generate it
+                return None
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(input_files), 8) or 1) as executor:
+            prefetched = list(executor.map(prefetch, input_files))
+        for input_file, loaded in zip(input_files, prefetched):
+            if loaded is None or loaded[0] != self._get_pmakefile_key(input_file):
+                # the files executed up until now have changed this file: what we have read is stale
+                loaded = self._load_pmakefile(input_file)
+            self._execute_loaded_pmakefile(input_file, *loaded)
+
+    def _get_pmakefile_key(self, input_file: pm.path) -> Tuple[pm.path, int, int]:
+        """
+        Compute the key of a PMakefile in ::_compiled_pmakefiles
+
+        :param input_file: file containing the code to execute
+        :return: the absolute path, the modification time and the size of the file
+        """
+        stat = os.stat(input_file)
+        return os.path.abspath(input_file), stat.st_mtime_ns, stat.st_size
+
+    def _load_pmakefile(self, input_file: pm.path) -> Tuple[Tuple[pm.path, int, int], Optional[str]]:
+        """
+        Fetch what is needed to execute a PMakefile
+
+        :param input_file: file containing the code to execute
+        :return: pair. The first element is the key of the file in ::_compiled_pmakefiles, the second is the content
+            of the file, or None if the file has already been compiled
+        """
+        # PMakefiles (especially the included ones) are usually executed several times with the same content.
+        # If the file has not changed since the last time, we do not need to parse and compile it again
+        code_key = self._get_pmakefile_key(input_file)
+        if code_key in self._compiled_pmakefiles:
+            return code_key, None
+        return code_key, self._read_pmakefile(input_file, code_key[2])
 
+    def _execute_loaded_pmakefile(self, input_file: pm.path, code_key: Tuple[pm.path, int, int], input_str: Optional[str]):
+        """
+        Execute a PMakefile fetched by ::_load_pmakefile
+
+        :param input_file: file containing the code to execute
+        :param code_key: the key of the file in ::_compiled_pmakefiles
+        :param input_str: content of the file. None if it has already been compiled
+        """
         try:
             # add a new level in the stack
             self._pmakefiles_include_stack.append(input_file)
             # execute the file
-            self.execute_string(input_str)
+            self._execute_code(input_str, code_key)
         finally:
             self._pmakefiles_include_stack.pop()
 
+    def _read_pmakefile(self, input_file: pm.path, size: int) -> str:
+        """
+        Read the whole content of a PMakefile. The file is read with (usually) a single system call and decoded
+        all at once, instead of going through the chunked decoding of a text file object
+
+        :param input_file: file containing the code to read
+        :param size: size of the file, in bytes
+        :return: content of the file, with universal newlines (like a file opened in text mode)
+        """
+        flags = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+        try:
+            # do not update the access time of the file: the include of a PMakefile is not worth a disk write
+            fd = os.open(input_file, flags | getattr(os, "O_NOATIME", 0))
+        except PermissionError:
+            # O_NOATIME is allowed only to the owner of the file
+            fd = os.open(input_file, flags)
+        try:
+            chunks = []
+            while True:
+                chunk = os.read(fd, max(size, 1 << 16))
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        finally:
+            os.close(fd)
+
+        encoding = self.input_encoding or locale.getpreferredencoding(False)
+        result = b"".join(chunks).decode(encoding)
+        if "\r" in result:
+            result = result.replace("\r\n", "\n").replace("\r", "\n")
+        return result
+
     def execute_string(self, string: str):
         """
         Execute the content of a string
         :param string: string to execute
         :return:
         """
+        self._execute_code(string, None)
+
+    def _execute_code(self, string: Optional[str], code_key: Optional[Tuple[pm.path, int, int]]):
+        """
+        Execute some pmakeup code
+
+        :param string: the code to execute. If None, the code is fetched from the already compiled ones
+        :param code_key: if not None, the key (absolute path, modification time and size of the PMakefile) where the
+            compiled code is stored in ::_compiled_pmakefiles
+        """
 
         try:
-            # remove the first line if it is empty
-            string = textwrap.dedent(string)
-            logging.debug("input string:")
-            logging.debug(string)
+            code = self._compiled_pmakefiles.get(code_key) if code_key is not None else None
+            if code is None:
+                # remove the common indentation. If the first line is not indented there is no common indentation
+                # at all, so we can avoid scanning the whole code
+                if string[:1] in (" ", "\t", "\r", "\n"):
+                    string = textwrap.dedent(string)
+                logging.debug("input string:")
+                logging.debug(string)
+                # the filename needs to remain "<string>": the error report below relies on it
+                code = compile(string, "<string>", "exec")
+                if code_key is not None:
+                    self._compiled_pmakefiles[code_key] = code
             self._update_eval_global()
             if self.pmake_cache is None:
                 # set tjhe pmakeup cache
-                self.pmake_cache = pm.JsonPMakeupCache("pmakeup-cache.json")
+                if self.pmake_cache_format == "json":
+                    self.pmake_cache = pm.JsonPMakeupCache("pmakeup-cache.json")
+                elif self.pmake_cache_format == "binary":
+                    self.pmake_cache = pm.MarshalPMakeupCache("pmakeup-cache.bin")
+                else:
+                    raise pm.PMakeupException(f"Invalid cache format \"{self.pmake_cache_format}\"!")
             # now execute the string
             exec(
-                string,
+                code,
                 self._eval_globals,
                 self._eval_globals
             )
@@ -569,5 +719,5 @@ class PMakeupModel(abc.ABC):
             print(f"{colorama.Fore.RED}Cause = {e}{colorama.Style.RESET_ALL}")
             print(f"{colorama.Fore.RED}File = {file_path}{colorama.Style.RESET_ALL}")
             print(f"{colorama.Fore.RED}Line = {line_no}{colorama.Style.RESET_ALL}")
-            raise e
+            raise
 
@@ -4,6 +4,22 @@ from collections import UserDict
 from pmakeup.models.AttrDict import AttrDict
 
 
+_RESERVED_NAMES = frozenset([
+    "pmakeup_cli_variables",
+    "pmakeup_plugins",
+    "pmakeup_model",
+    "pmakeup_info",
+    "pmakeup_requested_target_names",
+    "pmakeup_interesting_paths",
+    "pmakeup_latest_interesting_paths",
+    "variables",
+    "commands",
+])
+"""
+names that a function, a variable or a module in the registry cannot have, since the registry uses them
+"""
+
+
 class PMakeupRegistry(dict):
     """
     The shared context that will be used when computing "eval" or "exec" function, as a global variables.
@@ -30,18 +46,9 @@ class PMakeupRegistry(dict):
     def __getitem__(self, item):
         return super().__getitem__(item)
 
-    def can_a_function_have_a_name(self, func_name: str) -> bool:
-        return func_name not in [
-            "pmakeup_cli_variables",
-            "pmakeup_plugins",
-            "pmakeup_model",
-            "pmakeup_info",
-            "pmakeup_requested_target_names",
-            "pmakeup_interesting_paths",
-            "pmakeup_latest_interesting_paths",
-            "variables",
-            "commands",
-        ]
+    @staticmethod
+    def can_a_function_have_a_name(func_name: str) -> bool:
+        return func_name not in _RESERVED_NAMES
 
     def dump_registry(self) -> str:
         """
@@ -1,11 +1,17 @@
 import abc
+import contextlib
+import functools
 import getpass
 import logging
 import os
+import re
 import stat
 import subprocess
+import sys
 import tempfile
-from typing import Union, List, Tuple, Dict, Any, Iterable, Optional
+import time
+from operator import attrgetter
+from typing import Union, List, Tuple, Dict, Any, Iterable, Optional, Callable
 
 import psutil as psutil
 import pmakeup as pm
@@ -13,8 +19,120 @@ import pmakeup as pm
 from semantic_version import Version
 
 
+_NUMERIC_VERSION_RE = re.compile(r"^(0|[1-9]\d*)(?:\.(0|[1-9]\d*))?(?:\.(0|[1-9]\d*))?$")
+"""
+a version made only by 1, 2 or 3 numbers, like "3", "3.1" or "3.1.4". Leading zeros are not allowed, like in semantic versioning
+"""
+
+# permission bits used by the mark_file_as_* helpers. Copied here to avoid looking them up in the stat module every time
+_IRUSR = stat.S_IRUSR
+_IXUSR = stat.S_IXUSR
+_IROTH = stat.S_IROTH
+_IXOTH = stat.S_IXOTH
+_MKSTEMP_MODE = stat.S_IRUSR | stat.S_IWUSR
+"""
+the mode tempfile.mkstemp creates files with (0o600)
+"""
+
+_HAS_FCHMOD = hasattr(os, "fchmod")
+"""
+true if we can change the mode of an open file (not available on windows)
+"""
+
+USE_FAST_TMP = object()
+"""
+value to pass as directory to the temp files functions to let pmakeup choose a RAM-backed directory, if available
+"""
+
+
+_stat_cache: Dict[str, Tuple[float, Optional[os.stat_result]]] = {}
+"""
+stat results computed by cached_stat. Each value is the time when the entry was computed and the stat result
+(None if the path did not exist)
+"""
+
+
+def cached_stat(p: pm.path, ttl: float = 1.0) -> Optional[os.stat_result]:
+    """
+    Stat a path. If the path has been stat'ed less than ttl seconds ago, the previous result is returned.
+    Useful when the same paths are checked over and over (e.g., the discovery of the interesting paths).
+    Use it only for paths which are not expected to change in the meantime.
+
+    :param p: the path to stat
+    :param ttl: number of seconds a previous stat of the same path is considered still valid
+    :return: the stat result of the path (following symlinks) or None if the path does not exist
+    """
+    now = time.monotonic()
+    entry = _stat_cache.get(p)
+    if entry is not None and (now - entry[0]) < ttl:
+        return entry[1]
+    try:
+        result = os.stat(p)
+    except (FileNotFoundError, NotADirectoryError):
+        result = None
+    _stat_cache[p] = (now, result)
+    return result
+
+
+def _invalidate_cached_stat(p: pm.path):
+    """
+    Remove the path from the stat cache. Call it every time the path is changed
+
+    :param p: the path to remove
+    """
+    _stat_cache.pop(p, None)
+
+
+@functools.lru_cache(maxsize=None)
+def _default_tmp_dir() -> pm.path:
+    """
+    The directory where to put short-lived temp files when the caller does not care where they are.
+    On linux we prefer /dev/shm, since it is usually a tmpfs (so nothing is written on the disk)
+
+    :return: absolute path of the directory where to create temp files by default
+    """
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK | os.X_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _join_stdout_list(stdout: List[Union[str, bytes]]) -> str:
+    """
+    Convert the stdout of a command, split into several chunks, into a string
+    """
+    if all(isinstance(x, bytes) for x in stdout):
+        # decode everything at once. This also handles multi-byte characters split between 2 chunks
+        return b"".join(stdout).decode("utf-8")
+    tmp = []
+    for x in stdout:
+        if isinstance(x, bytes):
+            tmp.append(x.decode("utf-8"))
+        elif isinstance(x, str):
+            tmp.append(x)
+        else:
+            raise TypeError(f"invalid stdout output type {type(x)}!")
+    return ''.join(tmp)
+
+
+_STDOUT_HANDLERS: Dict[type, Callable[[Any], str]] = {
+    bytes: lambda x: x.decode("utf-8"),
+    str: lambda x: x,
+    list: _join_stdout_list,
+}
+"""
+for each stdout type supported by IOSSystem._convert_stdout, the function converting it into a string
+"""
+
+
 class IOSSystem(abc.ABC):
 
+    def __init__(self, model: "pm.PMakeupModel"):
+        self._model = model
+        self._temp_file_pool: "pm.TempFilePool" = pm.TempFilePool()
+        """
+        temporary files released by their users, which can be reused by ::create_temp_file
+        """
+
     @abc.abstractmethod
     def get_program_path(self) -> Iterable[pm.path]:
         """
@@ -60,7 +178,8 @@ class IOSSystem(abc.ABC):
             try:
                 yield proc.name(), proc.pid
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
-                logging.debug(f"Ignore process {proc.name()}")
+                # the process name may be unavailable as well (that is why we are here), so we log its pid
+                logging.debug("Ignore process %s", proc.pid)
 
     def is_process_with_name_running(self, name: str) -> bool:
         """
@@ -85,9 +204,9 @@ class IOSSystem(abc.ABC):
         try:
             p = psutil.Process(pid)
             p.terminate()
-        except psutil.NoSuchProcess as e:
+        except psutil.NoSuchProcess:
             if not ignore_if_process_does_not_exists:
-                raise e
+                raise
 
     def kill_process_with_name(self, name: str, ignore_if_process_does_not_exists: bool = True):
         """
@@ -112,19 +231,53 @@ class IOSSystem(abc.ABC):
         """
         return tempfile.TemporaryDirectory(prefix=directory_prefix)
 
-    def create_temp_file_with(self, directory: str, file_prefix: str = None, file_suffix: str = None, encoding: str = None, mode: str = None) -> Any:
+    def create_temp_file_with(self, directory: str, file_prefix: str = None, file_suffix: str = None, encoding: str = None, mode: str = None, pool: bool = False, spool_size: int = None) -> Any:
         """
         Create a temporary file on the file system. The return value of this function is something you can give to the
         "with" statement. The file will be automatically remove at the end of the with. You can access the file absolute path
         via the field "name" of the return value
 
-        :param directory: the directory where to put the file
+        :param directory: the directory where to put the file. If None or USE_FAST_TMP, a RAM-backed directory is
+            used if available. If you need to rename the file in another place, pass an explicit directory on
+            the same file system
         :param file_prefix: a string that will be put at the beginning of the filename
         :param file_suffix: a string that will be put at the end of the filename
         :param encoding: encoding used to open the file
         :param mode: the mode used to open the file. E.g., "w", "r", "w+". See open for further information
+        :param pool: if True, the file is taken from the pool of released temp files (if possible) and at the end
+            of the with it is given back to the pool instead of being removed
+        :param spool_size: if set, the content is kept in memory until it is bigger than this number of bytes; only
+            then it is written on the file system. Use it for small payloads that no other process needs to read,
+            since the field "name" is available only after the content has been written on the file system
         :return: a return value that can be used as input of with statement
         """
+        if directory is None or directory is USE_FAST_TMP:
+            directory = _default_tmp_dir()
+        # same default of NamedTemporaryFile
+        mode = mode or "w+b"
+        if pool:
+            return self._pooled_temp_file(directory, file_prefix, file_suffix, encoding, mode)
+        if spool_size is not None:
+            return tempfile.SpooledTemporaryFile(
+                max_size=spool_size,
+                mode=mode,
+                encoding=encoding,
+                prefix=file_prefix,
+                suffix=file_suffix,
+                dir=directory,
+            )
+        if sys.version_info >= (3, 12):
+            # the file is removed only at the end of the with (ignoring it if the user has already removed it).
+            # On windows, this allows other processes (e.g., the commands we execute) to open the file
+            return tempfile.NamedTemporaryFile(
+                mode=mode,
+                encoding=encoding,
+                prefix=file_prefix,
+                suffix=file_suffix,
+                dir=directory,
+                delete=True,
+                delete_on_close=False,
+            )
         return tempfile.NamedTemporaryFile(
             mode=mode,
             encoding=encoding,
@@ -134,69 +287,217 @@ class IOSSystem(abc.ABC):
             delete=True
         )
 
-    def create_temp_file(self, directory: str, file_prefix: str = None, file_suffix: str = None, readable_for_all: bool = False, executable_for_owner: bool = False, executable_for_all: bool = False) -> pm.path:
+    def create_memfd(self, name: str, mode: str = "w+b", encoding: str = None) -> Any:
+        """
+        Create a temporary file living only in RAM, without any entry on the file system. The return value of
+        this function is something you can give to the "with" statement. The file disappears at the end of the with.
+        The field "name" of the return value is a path you can use to reopen the file, but only from this process
+        (it is something like /proc/self/fd/N). If the platform does not support in-RAM files, a temp file
+        created with ::create_temp_file_with is returned instead
+
+        :param name: a name of the file. Used only for debugging purposes
+        :param mode: the mode used to open the file. E.g., "w", "r", "w+". See open for further information
+        :param encoding: encoding used to open the file
+        :return: a return value that can be used as input of with statement
+        """
+        return self._memfd_file(name, mode, encoding)
+
+    @contextlib.contextmanager
+    def _memfd_file(self, name: str, mode: str, encoding: str):
+        """
+        Implementation of ::create_memfd
+        """
+        try:
+            fd = os.memfd_create(name, os.MFD_CLOEXEC)
+        except (AttributeError, OSError):
+            # not linux or kernel too old
+            with self.create_temp_file_with(directory=None, file_prefix=name, mode=mode, encoding=encoding) as f:
+                yield f
+            return
+
+        try:
+            # we open the file by path, so the file object exposes a path in its name, like NamedTemporaryFile
+            with open(f"/proc/self/fd/{fd}", mode=mode, encoding=encoding) as f:
+                yield f
+        finally:
+            os.close(fd)
+
+    def create_temp_file(self, directory: str, file_prefix: str = None, file_suffix: str = None, readable_for_all: bool = False, executable_for_owner: bool = False, executable_for_all: bool = False, pool: bool = False) -> pm.path:
         """
         Creates the file
         Like ::create_temp_file_with, but the file needs to be manually removed
 
-        :param directory: the directory where to put the file
+        :param directory: the directory where to put the file. If None or USE_FAST_TMP, a RAM-backed directory is
+            used if available (unless the file needs to be executable, since such directories are often mounted
+            with noexec). If you need to rename the file in another place, pass an explicit directory on
+            the same file system
         :param file_prefix: a string that will be put at the beginning of the filename
         :param file_suffix: a string that will be put at the end of the filename
         :param readable_for_all: if True, the file can be read by anyone
         :param executable_for_owner: if True, the file can be executed by the owner
         :param executable_for_all: if True, anyone can execute the file
+        :param pool: if True, the file may be taken from the pool of released temp files and it can be given back to
+            it via ::release_temp_file
         :return: the absolute path of the temp file
         """
+        # compute all the permission bits at once, so we need to change the file mode only once
+        mask = (_IROTH if readable_for_all else 0) | \
+               (_IXOTH if executable_for_all else 0) | \
+               (_IXUSR if executable_for_owner else 0)
+        if directory is None or directory is USE_FAST_TMP:
+            directory = tempfile.gettempdir() if (executable_for_owner or executable_for_all) else _default_tmp_dir()
+        # a file someone has already released has the same name pattern and permissions: we can just reuse it
+        pool_key = (directory, file_prefix, file_suffix, mask)
+        if pool:
+            file_path = self._temp_file_pool.acquire(pool_key)
+            if file_path is not None:
+                return file_path
+
         fd, file_path = tempfile.mkstemp(
             prefix=file_prefix,
             suffix=file_suffix,
             dir=directory,
         )
+        if pool:
+            # only the files that may be released are tracked: the others (e.g., the scripts of the commands we
+            # execute) would stay in the pool forever
+            self._temp_file_pool.track(file_path, pool_key)
+        if mask and _HAS_FCHMOD:
+            # the file is still open: mkstemp creates it with 0o600, so we use the descriptor and we skip the stat
+            os.fchmod(fd, _MKSTEMP_MODE | mask)
+            mask = 0
         os.close(fd)
-        if readable_for_all:
-            self.mark_file_as_readable_by_all(file_path)
-        if executable_for_all:
-            self.mark_file_as_executable_by_all(file_path)
-        if executable_for_owner:
-            self.mark_file_as_executable_by_owner(file_path)
+        if mask:
+            # fchmod is not available on this platform (e.g., windows). We still know the mode mkstemp has used
+            self._or_mode(file_path, mask, st_mode=_MKSTEMP_MODE)
 
         return file_path
 
-    def mark_file_as_readable_by_user(self, file_path: pm.path):
+    def release_temp_file(self, file_path: pm.path) -> bool:
+        """
+        Tell that a file generated by ::create_temp_file (with pool set) is not needed anymore. The file is emptied
+        and kept aside, so that the next ::create_temp_file asking for the same kind of file can reuse it.
+        If the file cannot be reused, it is removed
+
+        :param file_path: absolute path of the temp file to release
+        :return: true if the file will be reused, false if it has been removed
+        :raise PMakeupException: if the file has not been generated by ::create_temp_file with pool set
+        """
+        return self._temp_file_pool.release(file_path)
+
+    @contextlib.contextmanager
+    def _pooled_temp_file(self, directory: str, file_prefix: str, file_suffix: str, encoding: str, mode: str):
+        """
+        Implementation of ::create_temp_file_with when the temp file is taken from (and given back to) the pool
+        """
+        file_path = self.create_temp_file(directory=directory, file_prefix=file_prefix, file_suffix=file_suffix, pool=True)
+        f = open(file_path, mode=mode, encoding=encoding)
+        try:
+            yield f
+        finally:
+            f.close()
+            self.release_temp_file(file_path)
+
+    def _with_stat(self, file_path: pm.path, dir_fd: int = None) -> Tuple[int, os.stat_result]:
+        """
+        Stat a file. Symbolic links are resolved only if the path is actually a link
+
+        :param file_path: the file involved
+        :param dir_fd: if present, a descriptor of an open directory. file_path is then relative to such a directory
+        :return: pair. The first element is the mode of the file, the second is the whole stat result
+        """
+        kwargs = {} if dir_fd is None else {"dir_fd": dir_fd}
+        st = os.stat(file_path, follow_symlinks=False, **kwargs)
+        if stat.S_ISLNK(st.st_mode):
+            # chmod follows the link, so we need the mode of the target
+            st = os.stat(file_path, **kwargs)
+        return st.st_mode, st
+
+    def _or_mode(self, file_path: pm.path, bits: int, st_mode: int = None, dir_fd: int = None):
+        """
+        Add some permission bits to the mode of a file. The file is stat'ed and chmod'ed only once
+
+        :param file_path: the file involved
+        :param bits: the permission bits to add to the current mode of the file (e.g., stat.S_IXUSR)
+        :param st_mode: the current mode of the file. If the caller already knows it, the file is not stat'ed at all
+        :param dir_fd: if present, a descriptor of an open directory. file_path is then relative to such a directory,
+            so the path does not need to be resolved from the root every time
+        """
+        if st_mode is None:
+            st_mode, _ = self._with_stat(file_path, dir_fd=dir_fd)
+        if dir_fd is None:
+            os.chmod(file_path, mode=st_mode | bits)
+        else:
+            os.chmod(file_path, mode=st_mode | bits, dir_fd=dir_fd)
+        _invalidate_cached_stat(file_path)
+
+    def mark_file_as_readable_by_user(self, file_path: pm.path, st_mode: int = None, dir_fd: int = None):
         """
         Mark the file as readable by the owner
 
         :param file_path: the file involved
+        :param st_mode: the current mode of the file, if already known. Avoids to stat the file
+        :param dir_fd: if present, file_path is relative to this open directory descriptor (not supported on windows)
         """
-        st = os.stat(file_path)
-        os.chmod(file_path, mode=st.st_mode | stat.S_IRUSR)
+        self._or_mode(file_path, _IRUSR, st_mode=st_mode, dir_fd=dir_fd)
 
-    def mark_file_as_executable_by_owner(self, file_path: pm.path):
+    def mark_file_as_executable_by_owner(self, file_path: pm.path, st_mode: int = None, dir_fd: int = None):
         """
         Mark the filev as executable by the owner
 
         :param file_path: the file involved
+        :param st_mode: the current mode of the file, if already known. Avoids to stat the file
+        :param dir_fd: if present, file_path is relative to this open directory descriptor (not supported on windows)
         """
-        st = os.stat(file_path)
-        os.chmod(file_path, mode=st.st_mode | stat.S_IXUSR)
+        self._or_mode(file_path, _IXUSR, st_mode=st_mode, dir_fd=dir_fd)
 
-    def mark_file_as_readable_by_all(self, file_path: pm.path):
+    def mark_file_as_readable_by_all(self, file_path: pm.path, st_mode: int = None, dir_fd: int = None):
         """
         Mark the file as readable by all
 
         :param file_path: the file involved
+        :param st_mode: the current mode of the file, if already known. Avoids to stat the file
+        :param dir_fd: if present, file_path is relative to this open directory descriptor (not supported on windows)
         """
-        st = os.stat(file_path)
-        os.chmod(file_path, mode=st.st_mode | stat.S_IROTH)
+        self._or_mode(file_path, _IROTH, st_mode=st_mode, dir_fd=dir_fd)
 
-    def mark_file_as_executable_by_all(self, file_path: pm.path):
+    def mark_file_as_executable_by_all(self, file_path: pm.path, st_mode: int = None, dir_fd: int = None):
         """
         Mark the filev as executable by all
 
         :param file_path: the file involved
-        """
-        st = os.stat(file_path)
-        os.chmod(file_path, mode=st.st_mode | stat.S_IXOTH)
+        :param st_mode: the current mode of the file, if already known. Avoids to stat the file
+        :param dir_fd: if present, file_path is relative to this open directory descriptor (not supported on windows)
+        """
+        self._or_mode(file_path, _IXOTH, st_mode=st_mode, dir_fd=dir_fd)
+
+    def mark_tree(self, root: pm.path, mode_or: int = 0, mode_and: int = ~0):
+        """
+        Change the permissions of all the files inside a directory (recursively). Directories and symlinks are
+        left untouched. Each file is chmod'ed by using the mode the directory scan has already fetched, so no
+        further stat is needed
+
+        :param root: the directory to scan. If it is a file, only such a file is changed
+        :param mode_or: permission bits to add to the files (e.g., stat.S_IXUSR | stat.S_IXOTH)
+        :param mode_and: the mode of each file is and'ed with this value before adding mode_or. Use it
+            to remove permission bits (e.g., ~stat.S_IWOTH)
+        """
+        if not os.path.isdir(root):
+            st = os.lstat(root)
+            os.chmod(root, (st.st_mode & mode_and) | mode_or)
+            _invalidate_cached_stat(root)
+            return
+
+        to_visit = [root]
+        while len(to_visit) > 0:
+            with os.scandir(to_visit.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        to_visit.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st_mode = entry.stat(follow_symlinks=False).st_mode
+                        os.chmod(entry.path, (st_mode & mode_and) | mode_or)
+                        _invalidate_cached_stat(entry.path)
 
     @abc.abstractmethod
     def set_global_environment_variable(self, group_name: str, name: str, value: Any):
@@ -409,11 +710,15 @@ class IOSSystem(abc.ABC):
             Otherwise we will return only the
         :return: iterable of files in the directory
         """
-        for x in os.listdir(folder):
-            if generate_absolute_path:
-                yield os.path.abspath(os.path.join(folder, x))
-            else:
-                yield x
+        if generate_absolute_path:
+            # DirEntry.path is built on top of the scanned folder, so it will be absolute as well
+            folder = os.path.abspath(folder)
+        with os.scandir(folder) as it:
+            for entry in it:
+                if generate_absolute_path:
+                    yield entry.path
+                else:
+                    yield entry.name
 
     def ls_only_files(self, folder: pm.path, generate_absolute_path: bool = False) -> Iterable[pm.path]:
         """
@@ -423,12 +728,16 @@ class IOSSystem(abc.ABC):
         :param generate_absolute_path: if true, we will generate in the outptu the absolute path of the subfolders. Otherwise we will return only the
         :return: iterable of files in the directory
         """
-        for f in os.listdir(folder):
-            if os.path.isfile(f):
-                if generate_absolute_path:
-                    yield os.path.abspath(os.path.join(folder, f))
-                else:
-                    yield f
+        if generate_absolute_path:
+            folder = os.path.abspath(folder)
+        # the directory entries already know their type, so no stat is needed on most filesystems
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file():
+                    if generate_absolute_path:
+                        yield entry.path
+                    else:
+                        yield entry.name
 
     def ls_only_directories(self, folder: pm.path, generate_absolute_path: bool = False) -> Iterable[pm.path]:
         """
@@ -439,17 +748,86 @@ class IOSSystem(abc.ABC):
             Otherwise we will return only the names
         :return: iterable of folders in directory
         """
-        for f in os.listdir(folder):
-            if os.path.isdir(os.path.abspath(os.path.join(folder, f))):
-                if generate_absolute_path:
-                    yield os.path.abspath(os.path.join(folder, f))
-                else:
-                    yield f
+        if generate_absolute_path:
+            folder = os.path.abspath(folder)
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_dir():
+                    if generate_absolute_path:
+                        yield entry.path
+                    else:
+                        yield entry.name
+
+    def ls_list(self, folder: pm.path, generate_absolute_path: bool = False) -> List[pm.path]:
+        """
+        Like ::ls, but all the entries are computed at once. Faster if you need all the entries anyway
+
+        :param folder: folder to scan.
+        :param generate_absolute_path: if true, we will generate in the outptu the absolute path of the subfolders.
+            Otherwise we will return only the names
+        :return: list of files in the directory
+        """
+        if generate_absolute_path:
+            folder = os.path.abspath(folder)
+        with os.scandir(folder) as it:
+            if generate_absolute_path:
+                return [entry.path for entry in it]
+            else:
+                return [entry.name for entry in it]
 
-    def _get_semantic_version(self, s: str) -> Version:
-        if len(s.split(".")) == 1:
+    def ls_only_files_list(self, folder: pm.path, generate_absolute_path: bool = False) -> List[pm.path]:
+        """
+        Like ::ls_only_files, but all the entries are computed at once. Faster if you need all the entries anyway
+
+        :param folder: folder to scan.
+        :param generate_absolute_path: if true, we will generate in the outptu the absolute path of the subfolders.
+            Otherwise we will return only the names
+        :return: list of files in the directory
+        """
+        if generate_absolute_path:
+            folder = os.path.abspath(folder)
+        with os.scandir(folder) as it:
+            if generate_absolute_path:
+                return [entry.path for entry in it if entry.is_file()]
+            else:
+                return [entry.name for entry in it if entry.is_file()]
+
+    def ls_only_directories_list(self, folder: pm.path, generate_absolute_path: bool = False) -> List[pm.path]:
+        """
+        Like ::ls_only_directories, but all the entries are computed at once. Faster if you need all the entries anyway
+
+        :param folder: folder to scan.
+        :param generate_absolute_path: if true, we will generate in the outptu the absolute path of the subfolders.
+            Otherwise we will return only the names
+        :return: list of folders in the directory
+        """
+        if generate_absolute_path:
+            folder = os.path.abspath(folder)
+        with os.scandir(folder) as it:
+            if generate_absolute_path:
+                return [entry.path for entry in it if entry.is_dir()]
+            else:
+                return [entry.name for entry in it if entry.is_dir()]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _get_semantic_version(s: str) -> Version:
+        """
+        Convert a (possibly partial) version string into a semantic version. Missing components are set to 0.
+        The same strings are often parsed several times, so the result is cached
+
+        :param s: a version like "3", "3.1" or "3.1.4"
+        :return: the semantic version represented by the string
+        """
+        m = _NUMERIC_VERSION_RE.match(s)
+        if m is not None:
+            # the most common case: build the version directly, without letting semantic_version parse it again
+            major, minor, patch = m.groups()
+            return Version(major=int(major), minor=int(minor or 0), patch=int(patch or 0))
+        parts = s.split(".", 2)
+        if len(parts) == 1:
             return Version(f"{s}.0.0")
-        elif len(s.split(".")) == 2:
+        elif len(parts) == 2:
             return Version(f"{s}.0")
         else:
             return Version(s)
@@ -467,35 +845,33 @@ class IOSSystem(abc.ABC):
 
         for k, values in interesting_paths.items():
             # remove all the paths which are not involved in the current architecture
-            tmp = list(filter(lambda x: x.architecture == architecture, values))
+            candidates = [x for x in values if x.architecture == architecture]
             # fetch the path with the latest version
-            max_interesting_path = None
-            for x in tmp:
-                if max_interesting_path is None:
-                    max_interesting_path = x
-                elif x.version > max_interesting_path.version:
-                    max_interesting_path = x
-
-            result[k] = max_interesting_path
+            result[k] = max(candidates, key=attrgetter("version"), default=None)
 
         return result
 
-    def _convert_stdout(self, stdout) -> str:
-        if isinstance(stdout, bytes):
-            stdout = stdout.decode("utf-8")
-        elif isinstance(stdout, list):
-            tmp = []
-            for x in stdout:
-                if isinstance(x, bytes):
-                    tmp.append(x.decode("utf-8"))
-                elif isinstance(x, str):
-                    tmp.append(x)
-                else:
-                    raise TypeError(f"invalid stdout output type {type(x)}!")
-            stdout = ''.join(tmp)
-        elif isinstance(stdout, str):
-            stdout = str(stdout)
-        else:
-            raise TypeError(f"invalid stdout output type {type(stdout)}!")
+    def _log_command_execution(self, level: int, actual_command: str, filepath: pm.path):
+        """
+        Log the command we are about to execute and the content of the script it runs.
+        If the logger would discard the messages, we do not even read the script
 
-        return stdout.strip()
+        :param level: logging level of the messages
+        :param actual_command: the command line that is going to be executed
+        :param filepath: the script executed by the command line
+        """
+        if not logging.getLogger().isEnabledFor(level):
+            return
+        logging.log(level, "Executing %s", actual_command, stacklevel=2)
+        with open(filepath, "r") as f:
+            logging.log(level, "in file \"%s\" = \n%s", filepath, f.read(), stacklevel=2)
+
+    def _convert_stdout(self, stdout) -> str:
+        handler = _STDOUT_HANDLERS.get(type(stdout))
+        if handler is None:
+            # maybe a subclass of a supported type
+            handler = next((h for t, h in _STDOUT_HANDLERS.items() if isinstance(stdout, t)), None)
+            if handler is None:
+                raise TypeError(f"invalid stdout output type {type(stdout)}!")
+
+        return handler(stdout).strip()
@@ -1,5 +1,8 @@
+import contextlib
 import logging
 import os
+import shlex
+import shutil
 import subprocess
 from typing import Union, List, Tuple, Dict, Any, Optional, Iterable
 
@@ -9,7 +12,7 @@ import pmakeup as pm
 class LinuxOSSystem(pm.IOSSystem):
 
     def __init__(self, model: "pm.PMakeupModel"):
-        self._model = model
+        super().__init__(model)
 
     # def get_git_commit(self, p: pm.path) -> str:
     #     result, stdout, stderr = self.execute_command(
@@ -80,97 +83,57 @@ class LinuxOSSystem(pm.IOSSystem):
             stdout_filepath = os.path.join(absolute_temp_dir, "stdout.txt")
             stderr_filepath = os.path.join(absolute_temp_dir, "stderr.txt")
 
+            # sudo is spawned directly, without a shell in between: the redirections the shell performed are
+            # done via the standard streams of the process
+            args = [shutil.which("sudo", path=actual_env.get("PATH")) or "sudo"]
             if len(actual_env) > 0:
-                env_part = ','.join(actual_env.keys())
-                env_part = f"--preserve-env={env_part}"
-            else:
-                env_part = ""
-
-            # Now execute file
+                args.append(f"--preserve-env={','.join(actual_env.keys())}")
             if execute_as_admin:
                 if admin_password:
-                    password_file = self.create_temp_file(directory=absolute_temp_dir, file_prefix="stdin-")
-                    with open(password_file, "w") as f:
-                        f.write(f"{admin_password}\n")
-
-                    if show_output_on_screen and capture_stdout:
-                        actual_command = f"""cat '{password_file}' | sudo {env_part} --stdin --login bash '{filepath}'"""
-                        actual_capture_output = True
-                        actual_read_stdout = False
-                    elif show_output_on_screen and not capture_stdout:
-                        actual_command = f"""cat '{password_file}' | sudo {env_part} --stdin --login bash '{filepath}'"""
-                        actual_capture_output = False
-                        actual_read_stdout = False
-                    elif not show_output_on_screen and capture_stdout:
-                        actual_command = f"""cat '{password_file}' | sudo {env_part} --stdin --login bash '{filepath}' > {stdout_filepath} 2>{stderr_filepath}"""
-                        actual_capture_output = False
-                        actual_read_stdout = True
-                    else:
-                        actual_command = f"""cat '{password_file}' | sudo {env_part} --stdin --login bash '{filepath}' 2>&1 > /dev/null"""
-                        actual_capture_output = False
-                        actual_read_stdout = False
-
-                else:
+                    # sudo reads the password from its standard input
+                    args.append("--stdin")
+            else:
+                args.extend(("--user", self.get_current_username()))
+            args.extend(("--login", "bash", filepath))
+            actual_command = " ".join(map(shlex.quote, args))
 
-                    if show_output_on_screen and capture_stdout:
-                        actual_command = f"""sudo {env_part} --login bash '{filepath}'"""
-                        actual_capture_output = True
-                        actual_read_stdout = False
-                    elif show_output_on_screen and not capture_stdout:
-                        actual_command = f"""sudo {env_part} --login bash '{filepath}'"""
-                        actual_capture_output = False
-                        actual_read_stdout = False
-                    elif not show_output_on_screen and capture_stdout:
-                        actual_command = f"""sudo {env_part} --login bash '{filepath}' > {stdout_filepath} 2>{stderr_filepath}"""
-                        actual_capture_output = False
-                        actual_read_stdout = True
-                    else:
-                        actual_command = f"""sudo {env_part} --login bash '{filepath}' 2>&1 > /dev/null"""
-                        actual_capture_output = False
-                        actual_read_stdout = False
+            self._log_command_execution(logging.INFO if log_entry else logging.DEBUG, actual_command, filepath)
 
-            else:
+            with contextlib.ExitStack() as stack:
                 if show_output_on_screen and capture_stdout:
-                    actual_command = f"""sudo {env_part} --user {self.get_current_username()} --login bash '{filepath}'"""
-                    actual_capture_output = True
-                    actual_read_stdout = False
+                    streams = dict(stdout=subprocess.PIPE, stderr=subprocess.PIPE)
                 elif show_output_on_screen and not capture_stdout:
-                    actual_command = f"""sudo {env_part} --user {self.get_current_username()} --login bash '{filepath}'"""
-                    actual_capture_output = False
-                    actual_read_stdout = False
+                    streams = dict()
                 elif not show_output_on_screen and capture_stdout:
-                    actual_command = f"""sudo {env_part} --user {self.get_current_username()} --login bash '{filepath}' > {stdout_filepath} 2>{stderr_filepath}"""
-                    actual_capture_output = False
-                    actual_read_stdout = True
+                    streams = dict(stdout=stack.enter_context(open(stdout_filepath, "wb")),
+                                   stderr=stack.enter_context(open(stderr_filepath, "wb")))
                 else:
-                    actual_command = f"""sudo {env_part} --user {self.get_current_username()} --login bash '{filepath}' 2>&1 > /dev/null"""
-                    actual_capture_output = False
-                    actual_read_stdout = False
-
-            if log_entry:
-                log_method = logging.info
-            else:
-                log_method = logging.debug
-            log_method(f"Executing {actual_command}")
-            with open(filepath, "r") as f:
-                log_method(f"in file \"{filepath}\" = \n{f.read()}")
-
-            result = subprocess.run(
-                args=actual_command,
-                cwd=cwd,
-                shell=True,
-                capture_output=actual_capture_output,
-                timeout=timeout,
-                env=env
-            )
+                    # as "2>&1 > /dev/null" did: stderr goes to our file descriptor 1, stdout is discarded
+                    streams = dict(stdout=subprocess.DEVNULL, stderr=1)
+                if execute_as_admin and admin_password:
+                    streams["input"] = f"{admin_password}\n".encode()
+
+                try:
+                    result = subprocess.run(
+                        args=args,
+                        cwd=cwd,
+                        timeout=timeout,
+                        env=env,
+                        **streams
+                    )
+                except FileNotFoundError as e:
+                    if e.filename != args[0]:
+                        raise
+                    # sudo is not installed: the shell would have reported the command as not found
+                    result = subprocess.CompletedProcess(args, 127, b"", b"")
 
             if check_exit_code and result.returncode != 0:
                 raise pm.PMakeupException(f"cwd=\"{cwd}\" command=\"{actual_command}\" exit=\"{result.returncode}\"")
 
-            if actual_capture_output:
+            if show_output_on_screen and capture_stdout:
                 stdout = self._convert_stdout(result.stdout)
                 stderr = self._convert_stdout(result.stderr)
-            elif actual_read_stdout:
+            elif not show_output_on_screen and capture_stdout:
                 with open(stdout_filepath) as f:
                     stdout = self._convert_stdout(f.read())
                 with open(stderr_filepath) as f:
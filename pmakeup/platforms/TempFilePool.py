@@ -0,0 +1,87 @@
+import contextlib
+import os
+from typing import Dict, List, Optional, Tuple, Any
+
+import pmakeup as pm
+
+
+class TempFilePool(object):
+    """
+    A set of temporary files that their users do not need anymore. Instead of creating a brand new temporary file
+    (which requires to generate random names until a free one is found), a temporary file with the same characteristics
+    (directory, prefix, suffix, permissions) is taken from here and emptied.
+    """
+
+    def __init__(self, max_files_per_key: int = 8):
+        self.max_files_per_key: int = max_files_per_key
+        """
+        maximum number of released files we keep for each set of characteristics. Files exceeding it are removed
+        """
+        self._free: Dict[Tuple[Any, ...], List[pm.path]] = {}
+        """
+        files that can be reused, grouped by their characteristics
+        """
+        self._keys: Dict[pm.path, Tuple[Any, ...]] = {}
+        """
+        the characteristics of every file that can be given back to this pool
+        """
+
+    def track(self, file_path: pm.path, key: Tuple[Any, ...]):
+        """
+        Tell the pool that a new temporary file has been created
+
+        :param file_path: absolute path of the temp file
+        :param key: the characteristics of the file
+        """
+        self._keys[file_path] = key
+
+    def acquire(self, key: Tuple[Any, ...]) -> Optional[pm.path]:
+        """
+        Fetch a released temporary file having the given characteristics
+
+        :param key: the characteristics the file needs to have
+        :return: the absolute path of an empty temp file, or None if there is none in the pool
+        """
+        files = self._free.get(key)
+        while files:
+            file_path = files.pop()
+            # the file might have been removed in the meantime (e.g., its directory has been deleted)
+            if os.path.isfile(file_path):
+                return file_path
+            del self._keys[file_path]
+        return None
+
+    def release(self, file_path: pm.path) -> bool:
+        """
+        Give back a temporary file to the pool. If the pool cannot accept it, the file is removed
+
+        :param file_path: absolute path of the file that the caller does not need anymore
+        :return: true if the file has been put in the pool, false if it has been removed instead
+        :raise PMakeupException: if the file has not been generated by the pool. In this case the file is left untouched
+        """
+        key = self._keys.get(file_path)
+        if key is None:
+            raise pm.PMakeupException(f"Cannot release \"{file_path}\": it is not a temporary file generated by pmakeup")
+        files = self._free.setdefault(key, [])
+        if file_path in files:
+            # already released: adding it twice would give the same file to two different callers
+            return True
+        if len(files) >= self.max_files_per_key or not os.path.isfile(file_path):
+            self._keys.pop(file_path, None)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(file_path)
+            return False
+        os.truncate(file_path, 0)
+        files.append(file_path)
+        return True
+
+    def clear(self):
+        """
+        Remove from the file system all the files in the pool
+        """
+        for files in self._free.values():
+            for file_path in files:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(file_path)
+                del self._keys[file_path]
+        self._free.clear()
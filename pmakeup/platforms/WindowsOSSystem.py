@@ -1,5 +1,6 @@
 import logging
 import os
+import stat
 import subprocess
 import tempfile
 from typing import Union, List, Tuple, Dict, Any, Optional, Iterable
@@ -52,10 +53,7 @@ class WindowsOSSystem(pm.IOSSystem):
 
                 # Now execute file
                 actual_command = f"""cmd.exe /C \"{filepath} > nul 2>&1\""""
-                log_method = logging.critical if log_entry else logging.debug
-                log_method(f"Executing {actual_command}")
-                with open(filepath, "r") as f:
-                    log_method(f"in file \"{filepath}\" = \n{f.read()}")
+                self._log_command_execution(logging.CRITICAL if log_entry else logging.DEBUG, actual_command, filepath)
 
                 if len(os.getcwd()) > 258:
                     raise ValueError(f"{os.getcwd()} path is too long. needs to be at most 258")
@@ -102,10 +100,7 @@ class WindowsOSSystem(pm.IOSSystem):
                 else:
                     raise ValueError(f"invalid credential type {credential_type}")
 
-                log_method = logging.critical if log_entry else logging.debug
-                log_method(f"Executing {actual_command}")
-                with open(filepath, "r") as f:
-                    log_method(f"in file \"{filepath}\" = \n{f.read()}")
+                self._log_command_execution(logging.CRITICAL if log_entry else logging.DEBUG, actual_command, filepath)
 
                 if len(os.getcwd()) > 258:
                     raise ValueError(f"{os.getcwd()} path is too long. needs to be at most 258")
@@ -145,10 +140,7 @@ class WindowsOSSystem(pm.IOSSystem):
 
                 # Now execute file
                 actual_command = f"""cmd.exe /C \"{filepath} > nul 2>&1\""""
-                log_method = logging.critical if log_entry else logging.debug
-                log_method(f"Executing {actual_command}")
-                with open(filepath, "r") as f:
-                    log_method(f"in file \"{filepath}\" = \n{f.read()}")
+                self._log_command_execution(logging.CRITICAL if log_entry else logging.DEBUG, actual_command, filepath)
 
                 if len(os.getcwd()) > 258:
                     raise ValueError(f"{os.getcwd()} path is too long. needs to be at most 258")
@@ -190,10 +182,7 @@ class WindowsOSSystem(pm.IOSSystem):
                 else:
                     raise ValueError(f"invalid credential type {credential_type}")
 
-                log_method = logging.critical if log_entry else logging.debug
-                log_method(f"Executing {actual_command}")
-                with open(filepath, "r") as f:
-                    log_method(f"in file \"{filepath}\" = \n{f.read()}")
+                self._log_command_execution(logging.CRITICAL if log_entry else logging.DEBUG, actual_command, filepath)
 
                 if len(os.getcwd()) > 258:
                     raise ValueError(f"{os.getcwd()} path is too long. needs to be at most 258")
@@ -233,10 +222,7 @@ class WindowsOSSystem(pm.IOSSystem):
 
                 actual_command = f"""cmd.exe /C \"{filepath}\""""
 
-                log_method = logging.critical if log_entry else logging.debug
-                log_method(f"Executing {actual_command}")
-                with open(filepath, "r") as f:
-                    log_method(f"in file \"{filepath}\" = \n{f.read()}")
+                self._log_command_execution(logging.CRITICAL if log_entry else logging.DEBUG, actual_command, filepath)
 
                 if len(os.getcwd()) > 258:
                     raise ValueError(f"{os.getcwd()} path is too long. needs to be at most 258")
@@ -284,10 +270,7 @@ class WindowsOSSystem(pm.IOSSystem):
                 else:
                     raise ValueError(f"invalid credential type {credential_type}")
 
-                log_method = logging.critical if log_entry else logging.debug
-                log_method(f"Executing {actual_command}")
-                with open(filepath, "r") as f:
-                    log_method(f"in file \"{filepath}\" = \n{f.read()}")
+                self._log_command_execution(logging.CRITICAL if log_entry else logging.DEBUG, actual_command, filepath)
 
                 if len(os.getcwd()) > 258:
                     raise ValueError(f"{os.getcwd()} path is too long. needs to be at most 258")
@@ -334,10 +317,7 @@ class WindowsOSSystem(pm.IOSSystem):
                 actual_capture_output = False
                 actual_read_stdout = True
 
-                log_method = logging.critical if log_entry else logging.debug
-                log_method(f"Executing {actual_command}")
-                with open(filepath, "r") as f:
-                    log_method(f"in file \"{filepath}\" = \n{f.read()}")
+                self._log_command_execution(logging.CRITICAL if log_entry else logging.DEBUG, actual_command, filepath)
 
                 if len(os.getcwd()) > 258:
                     raise ValueError(f"{os.getcwd()} path is too long. needs to be at most 258")
@@ -392,10 +372,7 @@ class WindowsOSSystem(pm.IOSSystem):
                 else:
                     raise ValueError(f"invlid credential type {credential_type}")
 
-                log_method = logging.critical if log_entry else logging.debug
-                log_method(f"Executing {actual_command}")
-                with open(filepath, "r") as f:
-                    log_method(f"in file \"{filepath}\" = \n{f.read()}")
+                self._log_command_execution(logging.CRITICAL if log_entry else logging.DEBUG, actual_command, filepath)
 
                 if len(os.getcwd()) > 258:
                     raise ValueError(f"{os.getcwd()} path is too long. needs to be at most 258")
@@ -472,7 +449,8 @@ class WindowsOSSystem(pm.IOSSystem):
         if "regasm" not in interesting_paths:
             interesting_paths["regasm"] = []
 
-        if os.path.isdir(folder32):
+        folder32_stat = pm.cached_stat(folder32)
+        if folder32_stat is not None and stat.S_ISDIR(folder32_stat.st_mode):
             # subfolder ris something like v1.2.3
             for subfolder in self._model.get_files_plugin().ls_only_directories(folder32):
                 interesting_paths["regasm"].append(pm.InterestingPath(
@@ -481,7 +459,8 @@ class WindowsOSSystem(pm.IOSSystem):
                     version=self._get_semantic_version(subfolder[1:])
                 ))
 
-        if os.path.isdir(folder64):
+        folder64_stat = pm.cached_stat(folder64)
+        if folder64_stat is not None and stat.S_ISDIR(folder64_stat.st_mode):
             # subfolder ris something like v1.2.3
             for subfolder in self._model.get_files_plugin().ls_only_directories(folder64):
                 interesting_paths["regasm"].append(pm.InterestingPath(
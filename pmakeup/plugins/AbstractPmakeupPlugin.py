@@ -1,12 +1,33 @@
 import abc
+import contextlib
+import functools
 import logging
 import os
-from typing import Iterable, Union, Callable, Tuple, Any
+from typing import Iterable, Union, Callable, Tuple, Any, Dict
 
 import pmakeup as pm
 import pmakeup.global_variables
 
 
+_PLUGIN_FUNCTION_NAMES: Dict[type, Tuple[str, ...]] = {}
+"""
+for each plugin class, the names of the functions it registers. See AbstractPmakeupPlugin::get_plugin_functions
+"""
+
+
+@functools.lru_cache(maxsize=4096)
+def _abs_path_wrt(cwd: pm.path, p: Tuple[pm.path, ...]) -> pm.path:
+    """
+    Implementation of AbstractPmakeupPlugin::_abs_wrt_cwd. Scripts tend to compute the same paths over and over, so we
+    remember the latest ones. Since the cwd is part of the key, there is no need to invalidate anything when it changes
+
+    :param cwd: absolute path of the current working directory
+    :param p: the path to build. If one of its elements is absolute, the previous ones (and cwd) are ignored
+    :return: absolute path of p
+    """
+    return os.path.abspath(os.path.join(cwd, *p))
+
+
 class AbstractPmakeupPlugin(abc.ABC):
 
     def __init__(self, model: "pm.PMakeupModel"):
@@ -15,6 +36,10 @@ class AbstractPmakeupPlugin(abc.ABC):
         """
         if true, we have already invoke the setup function; false otherwise 
         """
+        self._last_cwd: Tuple[Any, pm.path] = (None, "")
+        """
+        the latest absolute cwd set in the shared variables and its normalized version. See ::get_cwd
+        """
 
     # ################################################
     # plugin operations
@@ -34,22 +59,28 @@ class AbstractPmakeupPlugin(abc.ABC):
         """
         Yield all the functions registered by this plugin
         """
-        result = dict()
-        for k in dir(self):
-            if k.startswith("_"):
-                continue
-            if k in result:
-                raise KeyError(f"duplicate key \"{k}\". It is already mapped to the value {result[k]}")
-            logging.debug(f"Adding variable {k}")
-            try:
-                group, function = pm.register_command.add.plugins["call_dictionary"][k]
-                # getattr needs to be called only after checking plugins, becuae in this way we support property,
-                # not only functions
-                result[k] = getattr(self, k)
-            except KeyError:
-                pass
-
-        yield from result.items()
+        # getattr needs to be called only after checking plugins, becuae in this way we support property,
+        # not only functions
+        for k in self._get_plugin_function_names():
+            yield k, getattr(self, k)
+
+    @classmethod
+    def _get_plugin_function_names(cls) -> Tuple[str, ...]:
+        """
+        Names of all the functions registered by this plugin class. The names depend only on the class, so
+        the (expensive) scan of the class attributes is performed only the first time
+        """
+        if cls not in _PLUGIN_FUNCTION_NAMES:
+            call_dictionary = pm.register_command.add.plugins["call_dictionary"]
+            result = []
+            for k in dir(cls):
+                if k.startswith("_"):
+                    continue
+                if k in call_dictionary:
+                    logging.debug(f"Adding variable {k}")
+                    result.append(k)
+            _PLUGIN_FUNCTION_NAMES[cls] = tuple(result)
+        return _PLUGIN_FUNCTION_NAMES[cls]
 
     def get_plugin_name(self):
         """
@@ -160,7 +191,15 @@ class AbstractPmakeupPlugin(abc.ABC):
 
         :return: the CWD the current commands operates in, as absolute payj
         """
-        return os.path.abspath(self.get_shared_variables()["cwd"])
+        cwd = self.get_shared_variables()["cwd"]
+        last_cwd, last_result = self._last_cwd
+        if cwd is last_cwd:
+            return last_result
+        result = os.path.abspath(cwd)
+        if os.path.isabs(cwd):
+            # the result does not depend on the cwd of the process, so it can be reused until cwd is changed
+            self._last_cwd = (cwd, result)
+        return result
 
     def set_cwd(self, value):
         """
@@ -176,14 +215,19 @@ class AbstractPmakeupPlugin(abc.ABC):
         :param paths: the single elements of a path to join and whose absolute path we need to compute
         :return: absolute path, relative to the current working directory
         """
-        return os.path.abspath(os.path.join(self.get_cwd(), *paths))
+        cwd = self.get_shared_variables()["cwd"]
+        if not os.path.isabs(cwd):
+            # a relative cwd depends on the cwd of the process as well: resolve it so it can be used as cache key
+            cwd = self.get_cwd()
+        return _abs_path_wrt(cwd, paths)
 
     def _truncate_string(self, string: str, width: int, ndots: int = 3) -> str:
         """
         If a string is too long, we truncate it with "..."
         """
-        if len(string) > (width - ndots):
-            return string[:(width-ndots)] + "."*ndots
+        limit = width - ndots
+        if len(string) > limit:
+            return string[:limit] + "." * ndots
         else:
             return string
 
@@ -230,14 +274,40 @@ class AbstractPmakeupPlugin(abc.ABC):
     # Logging
     # ###################################################
 
-    def _log_command(self, message: str):
+    def _log_command(self, message: str, *args):
+        """
+        reserved. Useful to log the action performed by the user.
+        The message is formatted lazily, so if INFO messages are not shown we do not pay for building it
+
+        :param message: message to log. Can contain %-style placeholders
+        :param args: values of the placeholders in message
+        """
+        if self._is_log_command_enabled():
+            logging.info(message, *args)
+
+    def _is_log_command_enabled(self) -> bool:
+        """
+        reserved. Check if ::_log_command would actually log something. Useful to avoid computing data needed only
+        by the log message
+
+        :return: true if the messages of ::_log_command are shown, false otherwise
         """
-        reserved. Useful to log the action performed by the user
+        if not logging.getLogger().isEnabledFor(logging.INFO):
+            return False
+        return not self.get_variable_or_set_it("_disable_log_command", False)
 
-        :param message: message to log
+    @contextlib.contextmanager
+    def _log_command_disabled(self):
+        """
+        reserved. Silence ::_log_command while the context is active. Useful for commands implemented by calling other
+        commands: we log only the outer command, not every inner one. The previous state is restored on exit
         """
-        if not self.get_variable_or_set_it("_disable_log_command", False):
-            logging.info(message)
+        previous = self.get_variable_or_set_it("_disable_log_command", False)
+        self.set_variable("_disable_log_command", True)
+        try:
+            yield
+        finally:
+            self.set_variable("_disable_log_command", previous)
 
     # ################################################
     # abstract methods
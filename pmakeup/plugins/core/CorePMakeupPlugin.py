@@ -6,11 +6,12 @@ import stat
 import sys
 import tempfile
 from datetime import datetime
+from operator import attrgetter
 
 import colorama
 
 import urllib.request
-from typing import List, Iterable, Tuple, Any, Callable, Optional
+from typing import List, Iterable, Tuple, Any, Callable, Optional, Dict
 
 from semantic_version import Version
 
@@ -18,11 +19,90 @@ import configparser
 import pmakeup as pm
 
 
+_IS_WINDOWS: bool = os.name == "nt"
+"""
+true if pmakeup is running on windows. It never changes while pmakeup is running
+"""
+_IS_LINUX: bool = os.name == "posix"
+"""
+true if pmakeup is running on linux. It never changes while pmakeup is running
+"""
+_ARCHITECTURE: int = 64 if sys.maxsize > 2**32 else 32
+"""
+number of bits of the architecture pmakeup is running on. It never changes while pmakeup is running
+"""
+_DIGITS = frozenset("0123456789")
+"""
+a file name needs at least one of these characters to contain a version
+"""
+_SEMVER_CORE_RE = re.compile(r"\d+\.\d+\.\d+")
+"""
+regex used by ::semantic_version_2_only_core
+"""
+_QUASI_SEMVER_RE = re.compile(r"\d+(?:\.\d+(?:\.\d+)?)?")
+"""
+regex used by ::quasi_semantic_version_2_only_core
+"""
+_SYSTEM_VERSION = Version(pm.version.VERSION)
+"""
+version of the pmakeup currently running. Used by ::require_pmakeup_version
+"""
+
+
+
+def _fast_semver_core(basename: str) -> Optional[Version]:
+    """
+    Fetch the first "X.Y.Z" in basename (the same one _SEMVER_CORE_RE would find) without using regexes.
+    It handles only the common cases (e.g., "foo-1.2.3.tar.gz")
+
+    :param basename: the string where to look for the version
+    :return: the version found or None if the string is not simple enough. In the latter case use _SEMVER_CORE_RE
+    """
+    parts = basename.split(".")
+    for i, part in enumerate(parts[:-2]):
+        if not (part and part[-1].isdecimal()):
+            continue
+        # the first part ending with a digit is the only place where the regex can start matching
+        start = len(part) - 1
+        while start > 0 and part[start - 1].isdecimal():
+            start -= 1
+        major = part[start:]
+        minor = parts[i + 1]
+        end = 0
+        while end < len(parts[i + 2]) and parts[i + 2][end].isdecimal():
+            end += 1
+        patch = parts[i + 2][:end]
+        if not (minor.isdecimal() and patch):
+            return None
+        if any(len(x) > 1 and x[0] == "0" for x in (major, minor, patch)):
+            # leading zeros are not valid in semantic versioning: let Version raise the error
+            return None
+        return Version(major=int(major), minor=int(minor), patch=int(patch))
+    return None
+
+
 class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
     """
     Contains all the commands available for the user in a PMakeupfile.py file
     """
 
+    def __init__(self, model: "pm.PMakeupModel"):
+        super().__init__(model)
+        self._version_cache: Dict[Tuple[Callable[[str], Version], pm.path], Version] = {}
+        """
+        versions already computed by ::get_latest_version_in_folder. Each key is the version fetcher used and the
+        file involved. Only the built-in fetchers, which look at the file name alone, are cached
+        """
+        self._latest_paths: Dict[Tuple[str, int], pm.path] = {}
+        """
+        paths already computed by ::get_latest_path_with_architecture. Each key is the nominal path name and the
+        architecture
+        """
+        self._latest_paths_source: Any = None
+        """
+        the interesting paths ::_latest_paths has been computed from
+        """
+
     def _setup_plugin(self):
         pass
 
@@ -90,14 +170,19 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param architecture: either 32 or 64
         :return: the first path compliant with this path name
         """
-        max_x = None
-        for x in filter(lambda x: x.architecture == architecture, self._model._eval_globals.pmakeup_interesting_paths[current_path]):
+        interesting_paths = self._model._eval_globals.pmakeup_interesting_paths
+        if interesting_paths is not self._latest_paths_source:
+            # the interesting paths have been fetched again: what we have computed so far may be wrong
+            self._latest_paths.clear()
+            self._latest_paths_source = interesting_paths
+        key = (current_path, architecture)
+        if key not in self._latest_paths:
+            candidates = [x for x in interesting_paths[current_path] if x.architecture == architecture]
+            max_x = max(candidates, key=attrgetter("version"), default=None)
             if max_x is None:
-                max_x = x
-            elif x.version > max_x.version:
-                max_x = x
-
-        return max_x.path
+                raise pm.PMakeupException(f"No interesting path \"{current_path}\" with architecture {architecture} found!")
+            self._latest_paths[key] = max_x.path
+        return self._latest_paths[key]
 
     @pm.register_command.add("core")
     def ensure_condition(self, condition: Callable[[], bool], message: str = "") -> None:
@@ -169,13 +254,18 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param filename: the absolute path of a file that contains a version
         :return: the version
         """
-        regex = r"\d+\.\d+\.\d+"
         b = os.path.basename(filename)
-        m = re.search(regex, b)
-        logging.debug(f"checking if \"{filename}\" satisfies \"{regex}\"")
+        if _DIGITS.isdisjoint(b):
+            # e.g., README.md: there is no version at all, so we do not bother the regex engine
+            raise pm.PMakeupException(f"Cannot find the regex {_SEMVER_CORE_RE.pattern} within file \"{b}\"!")
+        result = _fast_semver_core(b)
+        if result is not None:
+            return result
+        m = _SEMVER_CORE_RE.search(b)
+        logging.debug("checking if \"%s\" satisfies \"%s\"", filename, _SEMVER_CORE_RE.pattern)
         if m is None:
-            raise pm.PMakeupException(f"Cannot find the regex {regex} within file \"{b}\"!")
-        logging.debug(f"yes: \"{m.group(0)}\"")
+            raise pm.PMakeupException(f"Cannot find the regex {_SEMVER_CORE_RE.pattern} within file \"{b}\"!")
+        logging.debug("yes: \"%s\"", m.group(0))
         return Version(m.group(0))
 
     @pm.register_command.add("core")
@@ -187,11 +277,12 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param filename: the absolute path of a file that contains a version
         :return: the version
         """
-        regex = r"\d+(?:\.\d+(?:\.\d+)?)?"
         b = os.path.basename(filename)
-        m = re.search(regex, b)
+        if _DIGITS.isdisjoint(b):
+            raise pm.PMakeupException(f"Cannot find the regex {_QUASI_SEMVER_RE.pattern} within file \"{b}\"!")
+        m = _QUASI_SEMVER_RE.search(b)
         if m is None:
-            raise pm.PMakeupException(f"Cannot find the regex {regex} within file \"{b}\"!")
+            raise pm.PMakeupException(f"Cannot find the regex {_QUASI_SEMVER_RE.pattern} within file \"{b}\"!")
         result = m.group(0)
         if len(result.split(".")) == 2:
             result += ".0"
@@ -228,36 +319,48 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
         if version_fetcher is None:
             version_fetcher = self.quasi_semantic_version_2_only_core
         p = self.paths.abs_path(folder)
+        # a custom fetcher may read the file content, which can change between calls: we cannot cache its results
+        cacheable = version_fetcher in (self.semantic_version_2_only_core, self.quasi_semantic_version_2_only_core)
 
+        # the messages below are generated for each file: build them only if someone is going to read them
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
         result_version = None
         result_list = []
         for file in self.platform.ls(p, generate_absolute_path=True):
-            logging.debug(f"Shuld we consider {file} for fetching the latest version?")
+            if debug:
+                logging.debug("Shuld we consider %s for fetching the latest version?", file)
             if not should_consider(file):
                 continue
-            # find the version
-            v = version_fetcher(file)
-            logging.debug(f"fetched version {v}. Latest version detected up until now is {result_version}")
+            # find the version. The same files are often scanned several times, so we reuse the versions already fetched
+            if cacheable:
+                key = (version_fetcher, file)
+                v = self._version_cache.get(key)
+                if v is None:
+                    v = version_fetcher(file)
+                    if len(self._version_cache) >= 4096:
+                        self._version_cache.clear()
+                    self._version_cache[key] = v
+            else:
+                v = version_fetcher(file)
+            if debug:
+                logging.debug("fetched version %s. Latest version detected up until now is %s", v, result_version)
             if result_version is None:
                 result_version = v
                 result_list = [file]
-                logging.debug(f"update version with {result_version}. Files are {' '.join(result_list)}")
+                if debug:
+                    logging.debug("update version with %s. Files are %s", result_version, " ".join(result_list))
             elif v > result_version:
                 result_version = v
                 result_list = [file]
-                logging.debug(f"update version with {result_version}. Files are {' '.join(result_list)}")
+                if debug:
+                    logging.debug("update version with %s. Files are %s", result_version, " ".join(result_list))
             elif v == result_version:
                 result_list.append(file)
-                logging.debug(f"update version with {result_version}. Files are {' '.join(result_list)}")
+                if debug:
+                    logging.debug("update version with %s. Files are %s", result_version, " ".join(result_list))
 
         return result_version, result_list
 
-    def _truncate_string(self, string: str, width: int, ndots: int = 3) -> str:
-        if len(string) > (width - ndots):
-            return string[:(width-ndots)] + "."*ndots
-        else:
-            return string
-
     @pm.register_command.add("core")
     def get_architecture(self) -> int:
         """
@@ -265,11 +368,7 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         :return: either 32 or 64 bit
         """
-        is_64 = sys.maxsize > 2**32
-        if is_64:
-            return 64
-        else:
-            return 32
+        return _ARCHITECTURE
 
     @pm.register_command.add("core")
     def on_windows(self) -> bool:
@@ -278,8 +377,7 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         :return: true if we are running on windows
         """
-        self._log_command(f"Checking if we are on a windows system")
-        return os.name == "nt"
+        return _IS_WINDOWS
 
     @pm.register_command.add("core")
     def on_linux(self) -> bool:
@@ -288,8 +386,7 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         :return: true if we are running on linux
         """
-        self._log_command(f"Checking if we are on a linux system")
-        return os.name == "posix"
+        return _IS_LINUX
 
     @pm.register_command.add("core")
     def clear_cache(self):
@@ -311,7 +408,7 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param overwrite_if_exists: if true, if the cache already contain a variable with the same name, such a varaible will be replaced
             with the new one
         """
-        self._log_command(f"Setting {name}={value} in cache")
+        self._log_command("Setting %s=%s in cache", name, value)
         self._model.pmake_cache.set_variable_in_cache(
             name=name,
             value=value,
@@ -329,7 +426,7 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
         result = self._model.pmake_cache.has_variable_in_cache(
             name=name
         )
-        self._log_command(f"Checking if \"{name}\" is present in the pamkeup cache. It is {'present' if result else 'absent'}")
+        self._log_command("Checking if \"%s\" is present in the pamkeup cache. It is %s", name, 'present' if result else 'absent')
         return result
 
     @pm.register_command.add("core")
@@ -385,7 +482,7 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
             new_value = mapper(self._model.pmake_cache.get_variable_in_cache(name))
         else:
             new_value = supplier()
-        self._log_command(f"Setting {name}={new_value} in cache")
+        self._log_command("Setting %s=%s in cache", name, new_value)
         self._model.pmake_cache.set_variable_in_cache(name, new_value)
 
     @pm.register_command.add("core")
@@ -394,12 +491,12 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
         Load all the variables present in cache into the available variables
         """
 
-        self._log_command(f"Loading variables in cache...")
+        self._log_command("Loading variables in cache...")
         i = 0
         for key in self._model.pmake_cache.variable_names():
             self.set_variable(key, self._model.pmake_cache.get_variable_in_cache(key))
             i += 1
-        self._log_command(f"Loaded {i} variables")
+        self._log_command("Loaded %s variables", i)
 
     @pm.register_command.add("core")
     def get_starting_cwd(self) -> pm.path:
@@ -504,9 +601,9 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         :param lowerbound: the minimum version this script is compliant with
         """
-        system_version = Version(pm.version.VERSION)
+        system_version = _SYSTEM_VERSION
         script_version = Version(lowerbound)
-        self._log_command(f"Checking if script minimum pmakeup version {script_version} >= {system_version}")
+        self._log_command("Checking if script minimum pmakeup version %s >= %s", script_version, system_version)
         if script_version > system_version:
             raise pm.PMakeupException(f"The script requires at least version {script_version} to be installed. Current version is {system_version}")
 
@@ -531,7 +628,7 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
 
         p = self.paths.abs_path(file)
-        self._log_command(f"Reading variables from property file {p}")
+        self._log_command("Reading variables from property file %s", p)
         config = configparser.ConfigParser()
         # see https://stackoverflow.com/a/19359720/1887602
         config.optionxform = str
@@ -542,7 +639,7 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
             if k in self.get_shared_variables():
                 logging.warning(f"Ignoring variable \"{k}\" from file {p}, since it alrady exist within the ambient")
                 continue
-            self._log_command(f"Adding variable \"{k}\" to {v}")
+            self._log_command("Adding variable \"%s\" to %s", k, v)
             self.get_shared_variables()[k] = v
 
     @pm.register_command.add("core")
@@ -552,7 +649,7 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         :param string: the commands to execute
         """
-        self._log_command(f"Include and execute string \"{string}\"")
+        self._log_command("Include and execute string \"%s\"", string)
         self._model.execute_string(string)
 
     @pm.register_command.add("core")
@@ -564,8 +661,22 @@ class CorePMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
 
         p = self.paths.abs_path(*file)
-        self._log_command(f"include file content \"{p}\"")
+        self._log_command("include file content \"%s\"", p)
         self._model.execute_file(p)
 
+    @pm.register_command.add("core")
+    def include_files(self, files: Iterable[pm.path]) -> None:
+        """
+        Include several files, one after the other. It is the same of calling ::include_file on each of them, but
+        the files are read from the disk at the same time. A file generated or modified by a previous one is read
+        again before including it. Fails if one of the paths does not exist when it needs to be included
+
+        :param files: the external files to include in the script. They are executed in the given order
+        """
+        paths = [self.paths.abs_path(f) for f in files]
+        if self._is_log_command_enabled():
+            self._log_command("include files content %s", ", ".join(f"\"{p}\"" for p in paths))
+        self._model.execute_files(paths)
+
 
 CorePMakeupPlugin.autoregister()
@@ -1,12 +1,192 @@
+import codecs
+import concurrent.futures
+import contextlib
+import errno
+import glob
+import itertools
+import locale
 import logging
 import os
 import re
 import shutil
 import stat
-from typing import Iterable, Union, Optional, Any, List, Callable
+from typing import Iterable, Union, Optional, Any, List, Callable, Set
 
 import pmakeup as pm
 
+try:
+    from win32file import CopyFileW as _win_copy_file
+    from pywintypes import error as _win_error
+except ImportError:
+    # pywin32 is optional and available only on windows
+    _win_copy_file = None
+    _win_error = None
+
+try:
+    import fcntl
+except ImportError:
+    # not available on windows
+    fcntl = None
+
+
+_COPY_BUF = 1 << 20
+"""
+size of the buffer used by _fast_copyfile when the kernel cannot copy the file for us
+"""
+_COPY_CHUNK = 1 << 30
+"""
+maximum number of bytes we ask the kernel to copy in a single os.copy_file_range/os.sendfile call
+"""
+_FICLONE = getattr(fcntl, "FICLONE", 0x40049409) if fcntl is not None and os.uname().sysname == "Linux" else None
+"""
+linux ioctl that makes a file share the blocks of another one (a reflink), on file systems supporting it
+(e.g., btrfs, XFS). fcntl exposes it only since python 3.12, so we fallback to its value
+"""
+
+
+def _fast_copyfile(src: pm.path, dst: pm.path) -> None:
+    """
+    Copy the content of src into dst, like shutil.copyfile does. On linux file systems supporting it, dst is a reflink
+    of src, so no data is copied at all. Otherwise, whenever possible, the bytes are copied by the kernel
+    (via os.copy_file_range, which also allows server side copies, or via os.sendfile)
+    without passing through python buffers. On windows, if pywin32 is installed, the copy is delegated to CopyFileW
+
+    :param src: file to copy
+    :param dst: file that will contain the same content of src
+    """
+    # a single stat of dst tells us both if it exists and which file it is
+    try:
+        dst_stat = os.stat(dst)
+    except OSError:
+        dst_stat = None
+    if dst_stat is not None and os.path.samestat(os.stat(src), dst_stat):
+        raise shutil.SameFileError(f"{src} and {dst} are the same file")
+    if _win_copy_file is not None:
+        try:
+            _win_copy_file(src, dst, False)
+        except _win_error as e:
+            # behave like shutil.copyfile, which raises OSError
+            raise OSError(None, e.strerror, src, e.winerror, dst) from e
+        return
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        infd = fsrc.fileno()
+        outfd = fdst.fileno()
+        offset = 0
+        if _FICLONE is not None:
+            try:
+                fcntl.ioctl(outfd, _FICLONE, infd)
+                return
+            except OSError:
+                # e.g., EOPNOTSUPP or EXDEV: the file system cannot share the blocks. Really copy them
+                pass
+        if hasattr(os, "copy_file_range"):
+            try:
+                while True:
+                    n = os.copy_file_range(infd, outfd, _COPY_CHUNK)
+                    if n == 0:
+                        return
+                    offset += n
+            except OSError:
+                # e.g., EXDEV on old kernels or unsupported file system. Try the other approaches
+                pass
+        if hasattr(os, "sendfile"):
+            try:
+                while True:
+                    n = os.sendfile(outfd, infd, offset, _COPY_CHUNK)
+                    if n == 0:
+                        fdst.truncate(offset)
+                        return
+                    offset += n
+            except OSError:
+                pass
+        # the kernel cannot help us: copy via a reusable buffer
+        fsrc.seek(offset)
+        fdst.seek(offset)
+        buffer = memoryview(bytearray(_COPY_BUF))
+        while True:
+            n = fsrc.readinto(buffer)
+            if not n:
+                break
+            fdst.write(buffer[:n])
+        fdst.truncate()
+
+
+_COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+"""
+number of threads used to copy or remove several files at once. File I/O releases the GIL, so the threads
+really run in parallel
+"""
+_WRITE_BUF = 256 * 1024
+"""
+buffer size of the files opened by the functions writing several lines
+"""
+_LINES_PER_WRITE = 4096
+"""
+number of lines joined together by _write_lines before writing them. Bounds the memory used for huge iterables
+"""
+
+
+def _write_lines(f, content: Iterable[Any]) -> None:
+    """
+    Write every element of content in f, each followed by a new line. Lines are written in blocks, so we perform
+    a write per block, not per line
+
+    :param f: file opened in text mode
+    :param content: the lines to write
+    """
+    it = iter(content)
+    while True:
+        block = "".join(f"{x}\n" for x in itertools.islice(it, _LINES_PER_WRITE))
+        if not block:
+            break
+        f.write(block)
+
+
+def _leaf_directories(directories: Set[pm.path]) -> Set[pm.path]:
+    """
+    Remove from a set of absolute directory paths the ones that are ancestors of other directories in the set.
+    Creating the remaining ones (via os.makedirs) creates all the directories in the original set
+
+    :param directories: absolute paths of directories
+    :return: the subset of directories which are not ancestors of any other directory in the set
+    """
+    ancestors = set()
+    for directory in directories:
+        current = directory
+        parent = os.path.dirname(current)
+        # stop when we reach the root or a part of the path we have already visited
+        while parent != current and parent not in ancestors:
+            ancestors.add(parent)
+            current, parent = parent, os.path.dirname(parent)
+    return directories - ancestors
+
+
+def _unlink_quietly(file_path: pm.path) -> None:
+    """
+    Remove a file, ignoring the errors the operating system may raise (e.g., the file has already been removed or
+    we lack the permissions)
+
+    :param file_path: the file to remove
+    """
+    logging.debug("Removing %s", file_path)
+    with contextlib.suppress(OSError):
+        os.unlink(file_path)
+
+
+def _fast_copy2(src: pm.path, dst: pm.path) -> pm.path:
+    """
+    Like shutil.copy2, but the content is copied with _fast_copyfile
+
+    :param src: file to copy
+    :param dst: file or directory where to copy src
+    :return: the path of the copied file
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    _fast_copyfile(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
 
 class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
@@ -30,7 +210,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: first absolute path of the program found. None if we did not find the program
         """
         self._log_command(
-            f"""Find the executable \"{program_name}\" in the place where the operating system usually puts installed programs...""")
+            "Find the executable \"%s\" in the place where the operating system usually puts installed programs...", program_name)
         result = self.platform.find_executable_in_program_directories(
             program_name=program_name,
         )
@@ -47,7 +227,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param encoding: encoding of the file. If unspecified, it is utf-8
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Creating empty file {p}")
+        self._log_command("Creating empty file %s", p)
         with open(p, "w", encoding=encoding) as f:
             pass
 
@@ -59,8 +239,8 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param file: the file whose permission needs to be changed
         """
         p = self.paths.abs_path(file)
-        self._log_command(f"""Allowing any user to unr {p}""")
-        os.chmod(p, mode=stat.S_IEXEC)
+        self._log_command("Allowing any user to unr %s", p)
+        os.chmod(p, mode=os.stat(p).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
 
     @pm.register_command.add("files")
     def make_directories(self, *folder: pm.path) -> None:
@@ -72,9 +252,9 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param folder: folders to create
         """
         f = self._abs_wrt_cwd(*folder)
-        self._log_command(f"""Recursively create directories \"{f}\"""")
+        self._log_command("Recursively create directories \"%s\"", f)
 
-        os.makedirs(self.paths.abs_path(f), exist_ok=True)
+        os.makedirs(f, exist_ok=True)
 
     @pm.register_command.add("files")
     def is_file(self, *p: pm.path) -> bool:
@@ -128,7 +308,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: the full path of the directory just created
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Creating folder {p}")
+        self._log_command("Creating folder %s", p)
         os.makedirs(name=p, exist_ok=True)
         return p
 
@@ -141,7 +321,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: true if the file exists, false otherwise
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Checking if the file {p} exists")
+        self._log_command("Checking if the file %s exists", p)
         return os.path.exists(p)
 
     @pm.register_command.add("files")
@@ -153,11 +333,13 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: true if the file exists **and** has no bytes; false otherwise
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Checking if the file {p} exists and is empty")
-        if not os.path.exists(p):
+        self._log_command("Checking if the file %s exists and is empty", p)
+        # a single stat tells us both if the file exists and its size
+        try:
+            st = os.stat(p)
+        except (FileNotFoundError, NotADirectoryError):
             return False
-        with open(p, "r") as f:
-            return f.read(1) == ""
+        return not stat.S_ISDIR(st.st_mode) and st.st_size == 0
 
     @pm.register_command.add("files")
     def is_directory_exists(self, name: pm.path) -> bool:
@@ -168,10 +350,9 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: true if the folder exists, false otherwise
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Checking if the folder {p} exists")
-        if os.path.exists(p) and os.path.isdir(p):
-            return True
-        return False
+        self._log_command("Checking if the folder %s exists", p)
+        # isdir is already false for paths that do not exist
+        return os.path.isdir(p)
 
     @pm.register_command.add("files")
     def is_directory_empty(self, name: pm.path) -> bool:
@@ -182,10 +363,14 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: true if the folder exists and is empty, false otherwise
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Checking if the folder {p} exists and is empty")
-        if os.path.exists(p) and os.path.isdir(p):
-            return len(os.listdir(p)) == 0
-        return False
+        self._log_command("Checking if the folder %s exists and is empty", p)
+        # we just need to know if there is at least one entry. No need to check beforehand if p is a directory:
+        # scandir fails anyway if it is not
+        try:
+            with os.scandir(p) as it:
+                return next(it, None) is None
+        except (FileNotFoundError, NotADirectoryError):
+            return False
 
     @pm.register_command.add("files")
     def is_file_non_empty(self, *name: pm.path) -> bool:
@@ -196,10 +381,15 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: true if the file exists **and** has at least one byte; false otherwise
         """
         p = self.paths.abs_path(*name)
-        self._log_command(f"Checking if the file {p} exists and is empty")
-        if not os.path.exists(p):
+        self._log_command("Checking if the file %s exists and is not empty", p)
+        try:
+            st = os.stat(p)
+        except (FileNotFoundError, NotADirectoryError):
             return False
-        return self.get_file_size(p) > 0
+        if stat.S_ISDIR(st.st_mode):
+            # the size of a directory is the size of all its files
+            return self.get_file_size(p) > 0
+        return st.st_size > 0
 
     @pm.register_command.add("files")
     def write_file(self, name: pm.path, content: Any, encoding: str = "utf-8", overwrite: bool = False,
@@ -215,12 +405,16 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
 
         p = self.paths.abs_path(name)
-        self._log_command(f"Writing file \"{p}\" with content \"{self._truncate_string(content, 20)}\"")
+        # content is converted only once: the same string is used both in the log and in the file
+        text = content if isinstance(content, str) else str(content)
+        if self._is_log_command_enabled():
+            # truncate the content only if someone is going to see it
+            self._log_command("Writing file \"%s\" with content \"%s\"", p, self._truncate_string(text, 20))
         if not overwrite and os.path.exists(p):
             return
         else:
             with open(p, "w", encoding=encoding) as f:
-                f.write(str(content))
+                f.write(text)
                 if add_newline:
                     f.write("\n")
 
@@ -236,13 +430,20 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
 
         p = self.paths.abs_path(name)
-        self._log_command(f"Writing file {p} with content {len(list(content))} lines")
         if not overwrite and os.path.exists(p):
             return
+        elif not self._is_log_command_enabled():
+            # nobody will see the number of lines written: do not count them
+            with open(p, "w", encoding=encoding, buffering=_WRITE_BUF) as f:
+                _write_lines(f, content)
         else:
-            with open(p, "w", encoding=encoding) as f:
-                for x in content:
-                    f.write(str(x) + "\n")
+            # content may be a generator: we count the lines while writing them, so we consume it only once.
+            # zip stops before advancing the counter when content is exhausted, so the next value of counter is the
+            # number of lines written
+            counter = itertools.count()
+            with open(p, "w", encoding=encoding, buffering=_WRITE_BUF) as f:
+                _write_lines(f, (x for x, _ in zip(content, counter)))
+            self._log_command("Writing file %s with content %s lines", p, next(counter))
 
     @pm.register_command.add("files")
     def read_lines(self, name: pm.path, encoding: str = "utf-8") -> Iterable[str]:
@@ -255,11 +456,9 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: iterable containing the lines of the file
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Reading lines from file {p}")
+        self._log_command("Reading lines from file %s", p)
         with open(p, "r", encoding=encoding) as f:
-            for line in f.readlines():
-                if line is None:
-                    continue
+            for line in f:
                 if line.strip() == "":
                     continue
                 yield line.rstrip("\n\r")
@@ -275,7 +474,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: string repersenting the content of the file
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Reading file {p} content")
+        self._log_command("Reading file %s content", p)
         with open(p, "r", encoding=encoding) as f:
             result = f.read()
         if trim_newlines:
@@ -286,36 +485,75 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
     def remove_last_n_line_from_file(self, name: pm.path, n: int = 1, consider_empty_line: bool = False,
                                      encoding: str = "utf-8") -> List[str]:
         """
-        Read the content of a file and remove the last n lines from the file involved. Then, rewrites the whole file
+        Remove the last n lines from the file involved. The file is read backwards and then truncated, so
+        only the lines removed are actually read
 
         :param name: file involved. If relative, it is relative to ::cwd()
         :param n: the number of lines to remove at the end.
-        :param consider_empty_line: if True, we consider empty lines as well.
-        :param encoding: the encoding used to rewrite file
-        :return: the lines just removed
+        :param consider_empty_line: if True, empty lines at the end of the file are removed as well, but they do
+            not count in n
+        :param encoding: the encoding of the file
+        :return: the lines just removed, starting from the last one of the file
         """
 
         p = self.paths.abs_path(name)
 
-        self._log_command(f"Remove {n} lines at the end of file {p} (consider empty line = {consider_empty_line})")
-        with open(name, mode="r", encoding=encoding) as f:
-            lines = list(f.readlines())
+        self._log_command("Remove %s lines at the end of file %s (consider empty line = %s)", n, p, consider_empty_line)
+        if "\n".encode(encoding) != b"\n":
+            # we look for new lines byte per byte, which does not work with encoding like utf-16
+            return self._remove_last_n_line_from_file_by_rewriting(p, n, consider_empty_line, encoding)
 
         result = []
-        final_i = 0
-        for i, line in enumerate(reversed(lines)):
-            if final_i == n:
-                break
-
-            if consider_empty_line and line.strip() == "":
+        with open(p, mode="rb+") as f:
+            offset = f.seek(0, os.SEEK_END)
+            # the not yet processed bytes of the file, starting from offset
+            pending = b""
+            cut = None
+            removed = 0
+            while removed < n:
+                # the current line ends at the end of pending. Its start is after the previous new line
+                start = pending.rfind(b"\n", 0, len(pending) - 1)
+                if start == -1 and offset > 0:
+                    # the beginning of the line has not been read yet
+                    read_size = min(4096, offset)
+                    offset -= read_size
+                    f.seek(offset)
+                    pending = f.read(read_size) + pending
+                    continue
+                if len(pending) == 0:
+                    # no more lines in the file
+                    break
+                line = pending[start + 1:].decode(encoding).replace("\r\n", "\n")
+                pending = pending[:start + 1]
+                cut = offset + start + 1
                 result.append(line)
-                continue
+                if not (consider_empty_line and line.strip() == ""):
+                    removed += 1
+
+            if cut is not None:
+                f.truncate(cut)
+
+        return result
+
+    def _remove_last_n_line_from_file_by_rewriting(self, p: pm.path, n: int, consider_empty_line: bool, encoding: str) -> List[str]:
+        """
+        Implementation of ::remove_last_n_line_from_file which reads the whole file and then rewrites it.
+        Used for encodings where a new line is not the byte 0x0A
+        """
+        with open(p, mode="r", encoding=encoding) as f:
+            lines = f.readlines()
+
+        result = []
+        removed = 0
+        while removed < n and len(lines) > 0:
+            line = lines.pop()
             result.append(line)
-            final_i += 1
+            if not (consider_empty_line and line.strip() == ""):
+                removed += 1
 
         # write the file
-        with open(name, mode="w", encoding=encoding) as f:
-            f.writelines(lines[:-final_i])
+        with open(p, mode="w", encoding=encoding) as f:
+            f.writelines(lines)
 
         return result
 
@@ -341,13 +579,30 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         :param name: filename
         :param content: string to append
-        :param encoding: encoding of the file. If missing, "utf-8" is used
+        :param encoding: encoding of the file. If missing, "utf-8" is used. If None, the locale encoding is used
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Appending {content} into file file {p}")
-        with open(p, "a", encoding=encoding) as f:
+        self._log_command("Appending %s into file file %s", content, p)
+        # we encode the lines ourselves into a bounded buffer, so we never build a string holding the whole content.
+        # Like text files do, None means the locale encoding
+        encoder = codecs.getincrementalencoder(encoding or locale.getpreferredencoding(False))()
+        with open(p, "ab") as f:
+            if f.tell() != 0:
+                # like text files do, do not write a BOM (e.g., utf-16) in the middle of the file
+                encoder.setstate(0)
+            buffer = bytearray()
             for x in content:
-                f.write(str(x) + "\n")
+                line = f"{x}\n"
+                if os.linesep != "\n":
+                    # text files would have translated the new lines
+                    line = line.replace("\n", os.linesep)
+                buffer += encoder.encode(line)
+                if len(buffer) >= _WRITE_BUF:
+                    f.write(buffer)
+                    buffer.clear()
+            buffer += encoder.encode("", final=True)
+            if buffer:
+                f.write(buffer)
 
     @pm.register_command.add("files")
     def copy_file(self, src: pm.path, dst: pm.path, create_dirs: bool = True):
@@ -370,8 +625,8 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         if not self.is_directory_exists(self.paths.get_parent_directory(adst)) and create_dirs:
             self.make_directories(self.paths.get_parent_directory(adst))
 
-        self._log_command(f"""copy file from \"{asrc}\" to \"{adst}\"""")
-        shutil.copyfile(asrc, adst)
+        self._log_command("copy file from \"%s\" to \"%s\"", asrc, adst)
+        _fast_copyfile(asrc, adst)
 
     @pm.register_command.add("files")
     def copy_tree(self, src: pm.path, dst: pm.path):
@@ -385,14 +640,20 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         asrc = self.paths.abs_path(src)
         adst = self.paths.abs_path(dst)
-        self._log_command(f"""Recursively copy files from \"{asrc}\" to \"{adst}\"""")
-        if os.path.isdir(asrc):
+        self._log_command("Recursively copy files from \"%s\" to \"%s\"", asrc, adst)
+        # a single stat tells us both if asrc is a directory or a file
+        try:
+            st_mode = os.stat(asrc).st_mode
+        except OSError:
+            st_mode = 0
+        if stat.S_ISDIR(st_mode):
             shutil.copytree(
                 asrc,
                 adst,
+                copy_function=_fast_copy2,
                 dirs_exist_ok=True,
             )
-        elif os.path.isfile(asrc):
+        elif stat.S_ISREG(st_mode):
             self.copy_file(asrc, adst)
         else:
             raise pm.InvalidScenarioPMakeupException(f"Cannot determine if {asrc} is a file or a directory!")
@@ -407,17 +668,36 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
         afolder = self.paths.abs_path(folder)
         adestination = self.paths.abs_path(destination)
-        self._log_command(f"""Copies all files inside \"{afolder}\" into the folder \"{adestination}\"""")
+        self._log_command("Copies all files inside \"%s\" into the folder \"%s\"", afolder, adestination)
 
-        try:
-            self.get_shared_variables()._disable_log_command = False
-            for x in self.ls(afolder, generate_absolute_path=False):
-                self.copy_tree(
-                    src=os.path.join(afolder, x),
-                    dst=os.path.abspath(os.path.join(adestination, x))
-                )
-        finally:
-            self.get_shared_variables()._disable_log_command = True
+        with os.scandir(afolder) as it:
+            entries = list(it)
+        os.makedirs(adestination, exist_ok=True)
+        # every entry has a different destination, so they can be copied concurrently
+        with concurrent.futures.ThreadPoolExecutor(max_workers=_COPY_WORKERS) as executor:
+            list(executor.map(lambda x: self._copy_one(adestination, x), entries))
+
+    def _copy_one(self, adestination: pm.path, entry: os.DirEntry) -> None:
+        """
+        Copy a single entry of a folder into another folder. Used by ::copy_folder_content.
+        The type of the entry is already known by the directory scan, so no stat is needed
+
+        :param adestination: absolute path of the folder where the entry will be copied into. It needs to exist
+        :param entry: the entry (file or directory) to copy
+        """
+        adst = os.path.join(adestination, entry.name)
+        self._log_command("Recursively copy files from \"%s\" to \"%s\"", entry.path, adst)
+        if entry.is_dir():
+            shutil.copytree(
+                entry.path,
+                adst,
+                copy_function=_fast_copy2,
+                dirs_exist_ok=True,
+            )
+        elif entry.is_file():
+            _fast_copyfile(entry.path, adst)
+        else:
+            raise pm.InvalidScenarioPMakeupException(f"Cannot determine if {entry.path} is a file or a directory!")
 
     @pm.register_command.add("files")
     def find_regex_match_in_file(self, pattern: str, *p: pm.path, encoding: str = "utf8",
@@ -435,7 +715,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
 
         fn = self._abs_wrt_cwd(*p)
-        self._log_command(f"""Looking for pattern {pattern} in file {fn}.""")
+        self._log_command("Looking for pattern %s in file %s.", pattern, fn)
         with open(fn, mode="r", encoding=encoding) as f:
             content = f.read()
 
@@ -455,7 +735,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
         p = self.paths.abs_path(name)
         self._log_command(
-            f"Replace substring \"{substring}\" in \"{replacement}\" in file {p} (up to {count} occurences)")
+            "Replace substring \"%s\" in \"%s\" in file %s (up to %s occurences)", substring, replacement, p, count)
         with open(p, mode="r", encoding=encoding) as f:
             content = f.read()
 
@@ -503,7 +783,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
                 # the sub operation may throw exception. In this case the file is reset. This is obviously very wrong,
                 # hence we added the try except in order to at least leave the file instact
                 self._log_command(
-                    f"Replace pattern \"{pattern}\" into \"{replacement}\" in file {p} (up to {count} occurences)")
+                    "Replace pattern \"%s\" into \"%s\" in file %s (up to %s occurences)", pattern, replacement, p, count)
                 content = re.sub(
                     pattern=pattern,
                     repl=replacement,
@@ -526,7 +806,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         def match(root: pm.path, f: str, whole_path: pm.path) -> bool:
             return f == filename
 
-        self._log_command(f"""Finding file with filename {filename} in directory {root_folder}""")
+        self._log_command("Finding file with filename %s in directory %s", filename, root_folder)
         yield from self.find_file_st(root_folder, match)
 
     @pm.register_command.add("files")
@@ -542,7 +822,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         def match(root: pm.path, f: str, whole_path: pm.path) -> bool:
             return f == folder
 
-        self._log_command(f"""Finding directory named {folder} in directory {root_folder}""")
+        self._log_command("Finding directory named %s in directory %s", folder, root_folder)
         yield from self.find_folder_st(root_folder, match)
 
     @pm.register_command.add("files")
@@ -555,10 +835,12 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: list of files with thwe given filename
         """
 
+        compiled_regex = re.compile(filename_regex)
+
         def match(root: pm.path, f: str, whole_path: pm.path) -> bool:
-            return re.search(pattern=filename_regex, string=f) is not None
+            return compiled_regex.search(f) is not None
 
-        self._log_command(f"""Finding file whose filename is compliant with regex {filename_regex} in directory {root_folder}""")
+        self._log_command("Finding file whose filename is compliant with regex %s in directory %s", filename_regex, root_folder)
         yield from self.find_file_st(root_folder, match)
 
     @pm.register_command.add("files")
@@ -571,11 +853,13 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: list of files with thwe given filename
         """
 
+        compiled_regex = re.compile(folder_regex)
+
         def match(root: pm.path, f: str, whole_path: pm.path) -> bool:
-            return re.search(pattern=folder_regex, string=f) is not None
+            return compiled_regex.search(f) is not None
 
         self._log_command(
-            f"""Finding folder whose name is compliant with regex {folder_regex} in directory {root_folder}""")
+            "Finding folder whose name is compliant with regex %s in directory %s", folder_regex, root_folder)
         yield from self.find_folder_st(root_folder, match)
 
     @pm.register_command.add("files")
@@ -588,10 +872,12 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: list of files with the given filename
         """
 
+        compiled_regex = re.compile(filename_regex)
+
         def match(root: pm.path, f: str, whole_path: pm.path) -> bool:
-            return re.search(pattern=filename_regex, string=whole_path) is not None
+            return compiled_regex.search(whole_path) is not None
 
-        self._log_command(f"""Finding file whose full absolute path is compliant with regex {filename_regex} in directory {root_folder}""")
+        self._log_command("Finding file whose full absolute path is compliant with regex %s in directory %s", filename_regex, root_folder)
         yield from self.find_file_st(root_folder, match)
 
     @pm.register_command.add("files")
@@ -604,10 +890,12 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: list of files with thwe given filename
         """
 
+        compiled_regex = re.compile(folder_regex)
+
         def match(root: pm.path, f: str, whole_path: pm.path) -> bool:
-            return re.search(pattern=folder_regex, string=whole_path) is not None
+            return compiled_regex.search(whole_path) is not None
 
-        self._log_command(f"""Finding directory whose absolute path is compliant with regex {folder_regex} in directory {root_folder}""")
+        self._log_command("Finding directory whose absolute path is compliant with regex %s in directory %s", folder_regex, root_folder)
         yield from self.find_folder_st(root_folder, match)
 
     @pm.register_command.add("files")
@@ -623,8 +911,10 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
 
         for root, dirs, files in os.walk(root_folder):
+            # the same of os.path.join(root, f), but the separator is handled once per directory
+            prefix = os.path.join(root, "")
             for f in files:
-                whole_path = os.path.join(root, f)
+                whole_path = prefix + f
                 if match(root, f, whole_path):
                     yield whole_path
 
@@ -720,8 +1010,10 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
 
         for root, dirs, files in os.walk(root_folder):
+            # the same of os.path.join(root, f), but the separator is handled once per directory
+            prefix = os.path.join(root, "")
             for f in dirs:
-                whole_path = os.path.join(root, f)
+                whole_path = prefix + f
                 if match(root, f, whole_path):
                     yield whole_path
 
@@ -740,17 +1032,26 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
         s = self.paths.abs_path(src)
         d = self.paths.abs_path(dst)
-        self._log_command(f"Copy files from {s} into {d} which basename follows {regex}")
-        try:
-            self._disable_log_command = False
-            for x in self.ls_recursive(src):
-                if re.search(pattern=regex, string=os.path.basename(x)):
-                    rel = os.path.relpath(x, s)
-                    copied_d = os.path.abspath(os.path.join(d, rel))
-                    os.makedirs(os.path.dirname(copied_d), exist_ok=True)
-                    shutil.copyfile(src=x, dst=copied_d)
-        finally:
-            self._disable_log_command = True
+        self._log_command("Copy files from %s into %s which basename follows %s", s, d, regex)
+        with self._log_command_disabled():
+            compiled_regex = re.compile(regex)
+            # the paths of the entries are built by joining s with the relative path, so the relative path is just
+            # what follows this prefix. s and d are already absolute and normalized
+            prefix_length = len(os.path.join(s, ""))
+            sources = []
+            destinations = []
+            for entry in self._scan_recursive(s):
+                if not entry.is_dir() and compiled_regex.search(entry.name):
+                    x = entry.path
+                    sources.append(x)
+                    destinations.append(os.path.join(d, x[prefix_length:]))
+            # create the directories beforehand, so the threads do not compete for creating the same ones.
+            # Each directory is created once and, since os.makedirs creates the parents as well, we skip the
+            # directories that are parents of other ones
+            for directory in _leaf_directories(set(map(os.path.dirname, destinations))):
+                os.makedirs(directory, exist_ok=True)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=_COPY_WORKERS) as executor:
+                list(executor.map(_fast_copyfile, sources, destinations))
 
     @pm.register_command.add("files")
     def move_tree(self, src: pm.path, dst: pm.path):
@@ -760,9 +1061,24 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param src: path of the directory to move
         :param dst: path of the directory that we will create
         """
-        self._log_command(f"""Recursively move files from \"{src}\" to \"{dst}\"""")
-        self.copy_tree(src, dst)
-        self.remove_tree(src)
+        self._log_command("Recursively move files from \"%s\" to \"%s\"", src, dst)
+        asrc = self.paths.abs_path(src)
+        adst = self.paths.abs_path(dst)
+        if not os.path.exists(asrc):
+            # check it before creating anything for dst
+            raise pm.InvalidScenarioPMakeupException(f"Cannot determine if {asrc} is a file or a directory!")
+        if not os.path.exists(adst):
+            # on the same file system a rename moves everything at once, without copying any data
+            os.makedirs(os.path.dirname(adst), exist_ok=True)
+            try:
+                os.replace(asrc, adst)
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+        # either src and dst are on different devices or we need to merge src into an existing dst
+        self.copy_tree(asrc, adst)
+        self.remove_tree(asrc)
 
     @pm.register_command.add("files")
     def remove_tree(self, *folder: pm.path, ignore_if_not_exists: bool = True) -> None:
@@ -773,12 +1089,12 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param ignore_if_not_exists: if the directory does not exists, we do nothing if htis field is true
         """
         p = self.paths.abs_path(*folder)
-        self._log_command(f"""Recursively remove files from \"{p}\"""")
+        self._log_command("Recursively remove files from \"%s\"", p)
         try:
             shutil.rmtree(p)
-        except Exception as e:
+        except Exception:
             if not ignore_if_not_exists:
-                raise e
+                raise
 
     @pm.register_command.add("files")
     def remove_files_that_basename(self, src: pm.path, regex: str):
@@ -793,19 +1109,18 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return:
         """
         s = self.paths.abs_path(src)
-        self._log_command(f"Remove the files from {s} which basename follows {regex}")
-        try:
-            self._disable_log_command = False
-            for x in self.ls_recursive(src):
-                logging.debug(f"Checking if {x} should be removed")
-                if re.search(pattern=regex, string=os.path.basename(x)):
-                    try:
-                        logging.debug(f"Removing {x}")
-                        os.unlink(x)
-                    except Exception as e:
-                        pass
-        finally:
-            self._disable_log_command = True
+        self._log_command("Remove the files from %s which basename follows %s", s, regex)
+        with self._log_command_disabled():
+            compiled_regex = re.compile(regex)
+            to_remove = []
+            for entry in self._scan_recursive(s):
+                if entry.is_dir():
+                    continue
+                logging.debug("Checking if %s should be removed", entry.path)
+                if compiled_regex.search(entry.name):
+                    to_remove.append(entry.path)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=_COPY_WORKERS) as executor:
+                list(executor.map(_unlink_quietly, to_remove))
 
     @pm.register_command.add("files")
     def move_file(self, src: pm.path, dst: pm.path):
@@ -817,7 +1132,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
         asrc = self.paths.abs_path(src)
         adst = self.paths.abs_path(dst)
-        self._log_command(f"""move file from \"{asrc}\" to \"{adst}\"""")
+        self._log_command("move file from \"%s\" to \"%s\"", asrc, adst)
         shutil.move(asrc, adst)
 
     @pm.register_command.add("files")
@@ -830,13 +1145,13 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: true if we have removed the file, false otherwise
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"remove file {p}")
+        self._log_command("remove file %s", p)
         try:
             os.unlink(p)
             return True
-        except Exception as e:
+        except Exception:
             if not ignore_if_not_exists:
-                raise e
+                raise
             return False
 
     @pm.register_command.add("files")
@@ -850,7 +1165,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param encoding: encoding used for reading the file
         """
         p = self.paths.abs_path(name)
-        self._log_command(f"Remove substring \"{substring}\" in file {p} (up to {count} occurences)")
+        self._log_command("Remove substring \"%s\" in file %s (up to %s occurences)", substring, p, count)
         with open(p, mode="r", encoding=encoding) as f:
             content = f.read()
 
@@ -870,8 +1185,9 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         """
         if folder is None:
             folder = self.get_cwd()
-        self._log_command(f"""listing files of folder \"{self.paths.abs_path(folder)}\"""")
-        yield from self.platform.ls(folder, generate_absolute_path)
+        p = self.paths.abs_path(folder)
+        self._log_command("listing files of folder \"%s\"", p)
+        yield from self.platform.ls(p, generate_absolute_path)
 
     @pm.register_command.add("files")
     def ls_only_files(self, folder: pm.path = None, generate_absolute_path: bool = False) -> Iterable[pm.path]:
@@ -885,7 +1201,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         if folder is None:
             folder = self.get_cwd()
         p = self.paths.abs_path(folder)
-        self._log_command(f"""listing files in fodler \"{p}\"""")
+        self._log_command("listing files in fodler \"%s\"", p)
         yield from self.platform.ls_only_files(p, generate_absolute_path)
 
     @pm.register_command.add("files")
@@ -901,7 +1217,7 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         if folder is None:
             folder = self.get_cwd()
         p = self.paths.abs_path(folder)
-        self._log_command(f"""listing folders in folder \"{p}\"""")
+        self._log_command("listing folders in folder \"%s\"", p)
         yield from self.platform.ls_only_directories(p, generate_absolute_path)
 
     @pm.register_command.add("files")
@@ -912,13 +1228,29 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param folder: folder to scan (default to cwd)
         :return: list of absolute filename representing the stored files
         """
-        self._log_command(f"""listing direct and indirect files of folder \"{self.paths.abs_path(folder)}\"""")
-        for dirpath, dirnames, filenames in os.walk(folder):
-            # dirpath: the cwd wheren dirnames and filesnames are
-            # dirnames: list of all the directories in dirpath
-            # filenames: list of all the files in dirpath
-            for filename in filenames:
-                yield self.paths.abs_path(os.path.join(dirpath, filename))
+        afolder = self.paths.cwd() if folder is None else self.paths.abs_path(folder)
+        self._log_command("listing direct and indirect files of folder \"%s\"", afolder)
+        for entry in self._scan_recursive(afolder):
+            if not entry.is_dir():
+                yield entry.path
+
+    @pm.register_command.add("files")
+    def ls_recursive_glob(self, pattern: str, folder: pm.path = None) -> Iterable[pm.path]:
+        """
+        Show the list of all the files and directories in the given folder (directly or indirectly) whose path,
+        relative to the folder, matches a glob pattern. "**" matches any number of nested directories, so
+        "**/*.py" lists all the python files in the folder. Like in a shell, entries starting with "." are not
+        matched by wildcards.
+        Faster than filtering the output of ::ls_recursive, since the filtering is performed while scanning
+
+        :param pattern: glob pattern the paths need to match (e.g., "**/*.py")
+        :param folder: folder to scan (default to cwd)
+        :return: absolute paths of the entries matching the pattern
+        """
+        afolder = self.paths.cwd() if folder is None else self.paths.abs_path(folder)
+        self._log_command("listing direct and indirect entries of folder \"%s\" matching \"%s\"", afolder, pattern)
+        # the folder name may contain glob special characters as well: they need to be matched literally
+        yield from glob.iglob(os.path.join(glob.escape(afolder), pattern), recursive=True)
 
     @pm.register_command.add("files")
     def ls_directories_recursive(self, folder: pm.path) -> Iterable[pm.path]:
@@ -928,13 +1260,37 @@ class FilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param folder: folder to scan (default to cwd)
         :return: list of absolute filename representing the stored directories
         """
-        self._log_command(f"""listing direct and indirect folders of folder \"{self.paths.abs_path(folder)}\"""")
-        for dirpath, dirnames, filenames in os.walk(folder):
-            # dirpath: the cwd wheren dirnames and filesnames are
-            # dirnames: list of all the directories in dirpath
-            # filenames: list of all the files in dirpath
-            for dirname in dirnames:
-                yield self.paths.abs_path(os.path.join(dirpath, dirname))
+        afolder = self.paths.cwd() if folder is None else self.paths.abs_path(folder)
+        self._log_command("listing direct and indirect folders of folder \"%s\"", afolder)
+        for entry in self._scan_recursive(afolder):
+            if entry.is_dir():
+                yield entry.path
+
+    def _scan_recursive(self, afolder: pm.path) -> Iterable[os.DirEntry]:
+        """
+        Yield all the entries (direct and indirect) of a folder. Like os.walk, symbolic links to directories are
+        yielded but not followed. The DirEntry caches the type of the entry, so checking if it is a directory
+        usually does not need any further system call
+
+        :param afolder: absolute path of the folder to scan
+        :return: the entries in afolder and in all its subdirectories
+        """
+        stack = [afolder]
+        while stack:
+            directory = stack.pop()
+            try:
+                it = os.scandir(directory)
+            except OSError:
+                # os.walk ignores the directories it cannot read as well
+                continue
+            subdirectories = []
+            with it:
+                for entry in it:
+                    yield entry
+                    if entry.is_dir() and not entry.is_symlink():
+                        subdirectories.append(entry.path)
+            # visit the subdirectories in the order os.scandir returned them
+            stack.extend(reversed(subdirectories))
 
 
 FilesPMakeupPlugin.autoregister()
@@ -9,7 +9,7 @@ class LinuxPMakeupPlugin(pm.AbstractPmakeupPlugin):
     """
 
     def __init__(self, model: "pm.PMakeupModel"):
-        self._model = model
+        super().__init__(model)
 
     def _setup_plugin(self):
         pass
@@ -1,42 +1,59 @@
 import logging
-from typing import Iterable
+import types
+from typing import Iterable, Dict, Tuple, Optional, Mapping
 
 import colorama
 
 import pmakeup as pm
 
 
-class LoggingPMakeupPlugin(pm.AbstractPmakeupPlugin):
+_FOREGROUND_MAPPING: Mapping[str, str] = types.MappingProxyType({
+    "RED": colorama.Fore.RED,
+    "GREEN": colorama.Fore.GREEN,
+    "YELLOW": colorama.Fore.YELLOW,
+    "BLUE": colorama.Fore.BLUE,
+    "MAGENTA": colorama.Fore.MAGENTA,
+    "CYAN": colorama.Fore.CYAN,
+    "WHITE": colorama.Fore.WHITE,
+})
+"""
+If you need to color stdout, the foreground mapping
+"""
+
+_BACKGROUND_MAPPING: Mapping[str, str] = types.MappingProxyType({
+    "RED": colorama.Back.RED,
+    "GREEN": colorama.Back.GREEN,
+    "YELLOW": colorama.Back.YELLOW,
+    "BLUE": colorama.Back.BLUE,
+    "MAGENTA": colorama.Back.MAGENTA,
+    "CYAN": colorama.Back.CYAN,
+    "WHITE": colorama.Back.WHITE,
+})
+"""
+If you need to color stdout, the background mapping
+"""
+
+
+def _build_color_prefix() -> Dict[Tuple[Optional[str], Optional[str]], str]:
+    result = {}
+    for fg in [None, *_FOREGROUND_MAPPING.keys()]:
+        for bg in [None, *_BACKGROUND_MAPPING.keys()]:
+            prefix = (_FOREGROUND_MAPPING[fg] if fg is not None else "") + \
+                     (_BACKGROUND_MAPPING[bg] if bg is not None else "")
+            for fg_name in {fg, fg and fg.lower()}:
+                for bg_name in {bg, bg and bg.lower()}:
+                    result[(fg_name, bg_name)] = prefix
+    return result
+
+
+_COLOR_PREFIX: Mapping[Tuple[Optional[str], Optional[str]], str] = types.MappingProxyType(_build_color_prefix())
+"""
+For each pair of foreground and background colors (None if absent), the escape sequence to put before the
+message. Both upper case and lower case names are present
+"""
 
-    def __init__(self, model: "pm.PMakeupModel"):
-        super().__init__(model)
-        """
-        Model referencing this object
-        """
-        self._foreground_mapping = {
-            "RED": colorama.Fore.RED,
-            "GREEN": colorama.Fore.GREEN,
-            "YELLOW": colorama.Fore.YELLOW,
-            "BLUE": colorama.Fore.BLUE,
-            "MAGENTA": colorama.Fore.MAGENTA,
-            "CYAN": colorama.Fore.CYAN,
-            "WHITE": colorama.Fore.WHITE,
-        }
-        """
-        If you need to color stdout, the foreground mapping
-        """
-        self._background_mapping = {
-            "RED": colorama.Back.RED,
-            "GREEN": colorama.Back.GREEN,
-            "YELLOW": colorama.Back.YELLOW,
-            "BLUE": colorama.Back.BLUE,
-            "MAGENTA": colorama.Back.MAGENTA,
-            "CYAN": colorama.Back.CYAN,
-            "WHITE": colorama.Back.WHITE,
-        }
-        """
-        If you need to color stdout, the background mapping
-        """
+
+class LoggingPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
     def _setup_plugin(self):
         pass
@@ -56,19 +73,17 @@ class LoggingPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param background: background color of the string. Accepted values: RED, GREEN, YELLOW, BLUE, MAGENT, CYAN, WHITE
         :return: colored string
         """
-        result = ""
-        should_reset = False
-        if foreground is not None:
-            result += str(self._foreground_mapping[foreground.upper()])
-            should_reset = True
-        if background is not None:
-            result += str(self._background_mapping[background.upper()])
-            should_reset = True
-        result += str(message)
-        if should_reset:
-            result += colorama.Style.RESET_ALL
-
-        return result
+        prefix = _COLOR_PREFIX.get((foreground, background))
+        if prefix is None:
+            # mixed case color names (or invalid ones, which will raise KeyError)
+            prefix = _COLOR_PREFIX[(
+                foreground.upper() if foreground is not None else None,
+                background.upper() if background is not None else None
+            )]
+        if prefix:
+            # the f-string converts message only if it is not already a string
+            return f"{prefix}{message}{colorama.Style.RESET_ALL}"
+        return message if isinstance(message, str) else str(message)
 
     @pm.register_command.add("logging")
     def info(self, message: str):
@@ -107,7 +122,7 @@ class LoggingPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param background: background color of the string. Accepted values: RED, GREEN, YELLOW, BLUE, MAGENT, CYAN, WHITE
         """
 
-        self._log_command(f"""echo \"{message}\"""")
+        self._log_command("echo \"%s\"", message)
         print(self._color_str(message, foreground, background))
 
     @pm.register_command.add("logging")
@@ -1,9 +1,20 @@
+import concurrent.futures
 import os
-from typing import Union, List, Dict, Tuple, Any, Iterable
+from typing import Union, List, Dict, Tuple, Any, Iterable, Optional, Callable
 
 import pmakeup as pm
 
 
+def _as_command_list(commands: Union[str, List[Union[str, List[str]]]]) -> List[Union[str, List[str]]]:
+    """
+    Normalize the commands given to an execute_* command: a single string is a list containing only that command
+
+    :param commands: the commands to execute
+    :return: the list of commands to execute
+    """
+    return [commands] if isinstance(commands, str) else commands
+
+
 class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
     def _setup_plugin(self):
@@ -15,6 +26,41 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
     def _get_dependencies(self) -> Iterable[type]:
         return []
 
+    def _resolve_cwd(self, cwd: Optional[pm.path]) -> pm.path:
+        """
+        Compute the absolute path of the directory where a command needs to be executed
+
+        :param cwd: directory requested by the user. If relative, it is relative to the CWD. If None, the CWD is used
+        :return: absolute path of the directory
+        """
+        paths = self.paths
+        if cwd is None:
+            return paths.cwd()
+        # abs_path caches its results, so the same cwd is not resolved again
+        return paths.abs_path(cwd)
+
+    def _fire_admin_command(self, fire: Callable, commands: Union[str, List[Union[str, List[str]]]],
+                            password: Optional[str], cwd: Optional[pm.path], **kwargs) -> Any:
+        """
+        Execute a command as an admin. All the execute_admin_* commands share this implementation: they differ only
+        in the platform function used to start the process
+
+        :param fire: one of the fire_admin_command_* functions of the platform
+        :param commands: the command to execute. They will be executed in the same context
+        :param password: password of the admin. If None, no password is passed to the platform
+        :param cwd: current working directory where the command is executed. If None, it is the CWD
+        :param kwargs: other parameters to pass to fire (e.g., env, check_exit_code, timeout)
+        :return: whatever fire returns
+        """
+        return fire(
+            commands=_as_command_list(commands),
+            cwd=self._resolve_cwd(cwd),
+            credential_type="password",
+            credential=password,
+            log_entry=True,
+            **kwargs
+        )
+
     @pm.register_command.add("operating system")
     def is_program_installed(self, program_name: str) -> bool:
         """
@@ -24,7 +70,7 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param program_name: the name of the program (e.g., dot)
         :return: true if there is a program accessible to the PATH with the given name, false otherwise
         """
-        self._log_command(f"""Checking if the executable \"{program_name}\" is in PATH""")
+        self._log_command("Checking if the executable \"%s\" is in PATH", program_name)
         return self.platform.is_program_installed(program_name)
 
     @pm.register_command.add("operating system")
@@ -55,13 +101,8 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param env: a dictionary representing the key-values of the environment variables
         :return: pid of running process
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
+        cwd = self._resolve_cwd(cwd)
+        commands = _as_command_list(commands)
 
         result = self.platform.fire_command_and_forget(
             commands=commands,
@@ -84,13 +125,8 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param timeout: if positive, we will give up waiting for the command after the amount of seconds
         :return: triple. The first element is the error code, the second is the stdout (if captured), the third is stderr
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
+        cwd = self._resolve_cwd(cwd)
+        commands = _as_command_list(commands)
 
         result = self.platform.fire_command_and_wait(
             commands=commands,
@@ -115,13 +151,8 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param timeout: if positive, we will give up waiting for the command after the amount of seconds
         :return: triple. The first element is the error code, the second is the stdout (if captured), the third is stderr
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
+        cwd = self._resolve_cwd(cwd)
+        commands = _as_command_list(commands)
 
         result = self.platform.fire_command_and_show_stdout(
             commands=commands,
@@ -147,13 +178,8 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param timeout: if positive, we will give up waiting for the command after the amount of seconds
         :return: triple. The first element is the error code, the second is the stdout (if captured), the third is stderr
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
+        cwd = self._resolve_cwd(cwd)
+        commands = _as_command_list(commands)
 
         exit_code, stdout, stderr = self.platform.fire_command_and_capture_stdout(
             commands=commands,
@@ -175,23 +201,13 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param env: a dictionary representing the key-values of the environment variables
         :return: pid of running process
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
-
-        result = self.platform.fire_admin_command_and_forget(
+        return self._fire_admin_command(
+            fire=self.platform.fire_admin_command_and_forget,
             commands=commands,
+            password=None,
             cwd=cwd,
             env=env,
-            credential_type="password",
-            credential=None,
-            log_entry=True,
         )
-        return result
 
     @pm.register_command.add("operating system")
     def execute_admin_and_forget(self, commands: Union[str, List[Union[str, List[str]]]], cwd: pm.path = None,
@@ -207,25 +223,15 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param timeout: if positive, we will give up waiting for the command after the amount of seconds
         :return: triple. The first element is the error code, the second is the stdout (if captured), the third is stderr
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
-
-        result = self.platform.fire_admin_command_and_wait(
+        return self._fire_admin_command(
+            fire=self.platform.fire_admin_command_and_wait,
             commands=commands,
+            password=None,
             cwd=cwd,
             env=env,
             check_exit_code=check_exit_code,
             timeout=timeout,
-            credential_type="password",
-            credential=None,
-            log_entry=True,
         )
-        return result
 
     @pm.register_command.add("operating system")
     def execute_admin_stdout_on_screen(self, commands: Union[str, List[Union[str, List[str]]]], cwd: pm.path = None,
@@ -242,25 +248,15 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: triple. The first element is the error code, the second is the stdout (if captured),
             the third is stderr
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
-
-        result = self.platform.fire_admin_command_and_show_stdout(
+        return self._fire_admin_command(
+            fire=self.platform.fire_admin_command_and_show_stdout,
             commands=commands,
+            password=None,
             cwd=cwd,
             env=env,
             check_exit_code=check_exit_code,
             timeout=timeout,
-            credential_type="password",
-            credential=None,
-            log_entry=True,
         )
-        return result
 
     @pm.register_command.add("operating system")
     def execute_admin_return_stdout(self, commands: Union[str, List[Union[str, List[str]]]], cwd: pm.path = None,
@@ -277,25 +273,15 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: triple. The first element is the error code, the second is the stdout (if captured),
             the third is stderr
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
-
-        exit_code, stdout, stderr = self.platform.fire_admin_command_and_capture_stdout(
+        return self._fire_admin_command(
+            fire=self.platform.fire_admin_command_and_capture_stdout,
             commands=commands,
+            password=None,
             cwd=cwd,
             env=env,
             check_exit_code=check_exit_code,
             timeout=timeout,
-            credential_type="password",
-            credential=None,
-            log_entry=True
         )
-        return exit_code, stdout, stderr
 
     @pm.register_command.add("operating system")
     def execute_admin_with_password_and_run_in_background(self, commands: Union[str, List[Union[str, List[str]]]], password: str, cwd: pm.path = None,
@@ -309,23 +295,13 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param env: a dictionary representing the key-values of the environment variables
         :return: triple. The first element is the error code, the second is the stdout (if captured), the third is stderr
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
-
-        result, _, _ = self.platform.fire_admin_command_and_forget(
+        return self._fire_admin_command(
+            fire=self.platform.fire_admin_command_and_forget,
             commands=commands,
+            password=password,
             cwd=cwd,
             env=env,
-            credential_type="password",
-            credential=password,
-            log_entry=True,
         )
-        return result
 
     @pm.register_command.add("operating system")
     def execute_admin_with_password_fire_and_forget(self, commands: Union[str, List[Union[str, List[str]]]],
@@ -348,25 +324,15 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
             Do **not** use this in production code, since the password will be 'printed in clear basically everywhere!
             (e.g., history, system monitor, probably in a file as well)
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
-
-        result, _, _ = self.platform.fire_admin_command_and_wait(
+        return self._fire_admin_command(
+            fire=self.platform.fire_admin_command_and_wait,
             commands=commands,
+            password=password,
             cwd=cwd,
             env=env,
             check_exit_code=check_exit_code,
             timeout=timeout,
-            credential_type="password",
-            credential=password,
-            log_entry=True,
         )
-        return result
 
     @pm.register_command.add("operating system")
     def execute_admin_with_password_stdout_on_screen(self, commands: Union[str, List[Union[str, List[str]]]],
@@ -387,25 +353,15 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: triple. The first element is the error code, the second is the stdout (if captured),
             the third is stderr
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
-
-        result = self.platform.fire_admin_command_and_show_stdout(
+        return self._fire_admin_command(
+            fire=self.platform.fire_admin_command_and_show_stdout,
             commands=commands,
+            password=password,
             cwd=cwd,
             env=env,
             check_exit_code=check_exit_code,
             timeout=timeout,
-            credential_type="password",
-            credential=password,
-            log_entry=True,
         )
-        return result
 
     @pm.register_command.add("operating system")
     def execute_admin_with_password_return_stdout(self, commands: Union[str, List[Union[str, List[str]]]],
@@ -427,25 +383,52 @@ class OperatingSystemPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: triple. The first element is the error code, the second is the stdout (if captured),
             the third is stderr
         """
-        if cwd is None:
-            cwd = self.paths.cwd()
-        else:
-            cwd = self.paths.abs_path(cwd)
-
-        if isinstance(commands, str):
-            commands = [commands]
-
-        exit_code, stdout, stderr = self.platform.fire_admin_command_and_capture_stdout(
+        return self._fire_admin_command(
+            fire=self.platform.fire_admin_command_and_capture_stdout,
             commands=commands,
+            password=password,
             cwd=cwd,
             env=env,
             check_exit_code=check_exit_code,
             timeout=timeout,
-            credential_type="password",
-            credential=password,
-            log_entry=True
         )
-        return exit_code, stdout, stderr
+
+    @pm.register_command.add("operating system")
+    def execute_admin_with_password_return_stdout_concurrently(self, commands_list: Iterable[Union[str, List[Union[str, List[str]]]]],
+                                                               password: str, cwd: pm.path = None,
+                                                               env: Dict[str, Any] = None, check_exit_code: bool = True,
+                                                               timeout: int = None,
+                                                               max_workers: int = None) -> List[Tuple[int, str, str]]:
+        """
+        Like ::execute_admin_with_password_return_stdout, but executes several independent groups of commands at the
+        same time. Each group is executed by its own process, so the time spent in creating a process and in waiting
+        for it is overlapped with the others. Use it only if the groups do not depend on each other
+
+        :param commands_list: the groups of commands to execute. The commands in a single group are executed in the
+            same context (like the commands parameter of ::execute_admin_with_password_return_stdout)
+        :param password: **[UNSAFE!!!!]** see ::execute_admin_with_password_return_stdout
+        :param cwd: current working directory where the commands are executed
+        :param env: a dictionary representing the key-values of the environment variables
+        :param check_exit_code: if true, we will generate an exception if an exit code is different than 0
+        :param timeout: if positive, we will give up waiting for a group of commands after the amount of seconds
+        :param max_workers: maximum number of groups executed at the same time. If missing, we use the default of
+            concurrent.futures.ThreadPoolExecutor
+        :return: for each group (in the same order of commands_list), the triple returned by
+            ::execute_admin_with_password_return_stdout
+        """
+        # the processes do all the work: the threads just wait for them
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda commands: self.execute_admin_with_password_return_stdout(
+                    commands=commands,
+                    password=password,
+                    cwd=cwd,
+                    env=env,
+                    check_exit_code=check_exit_code,
+                    timeout=timeout,
+                ),
+                commands_list
+            ))
 
 
 OperatingSystemPMakeupPlugin.autoregister()
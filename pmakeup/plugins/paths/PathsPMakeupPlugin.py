@@ -1,4 +1,5 @@
 import os
+import re
 from typing import Iterable
 
 from semantic_version import Version
@@ -6,6 +7,16 @@ from semantic_version import Version
 import pmakeup as pm
 
 
+_SEMVER_PREFIX_RE = re.compile(r"\d+\.\d+\.\d+")
+"""
+every semantic version starts with a string matching this regex. Used by ::cd_into_directories
+"""
+_INT_RE = re.compile(r"\s*[+-]?\d+(?:_\d+)*\s*")
+"""
+the strings int() is able to convert have to fully match this regex. Used by ::cd_into_directories
+"""
+
+
 class PathsPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
     def _setup_plugin(self):
@@ -41,7 +52,7 @@ class PathsPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         def recurse(afilename: str, abase: pm.path) -> pm.path:
             file_wrt_base = os.path.abspath(os.path.join(abase, afilename))
-            if os.path.exists(file_wrt_base) and os.path.isfile(file_wrt_base):
+            if os.path.isfile(file_wrt_base):
                 return os.path.normpath(file_wrt_base)
             else:
                 aparent = os.path.normpath(os.path.join(abase, os.pardir))
@@ -153,11 +164,7 @@ class PathsPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         :param p: the path to build
         """
-        actual_path = os.path.join(*p)
-        if os.path.isabs(actual_path):
-            return os.path.abspath(actual_path)
-        else:
-            return os.path.abspath(os.path.join(self.get_cwd(), actual_path))
+        return self._abs_wrt_cwd(*p)
 
     @pm.register_command.add("paths")
     def cwd(self) -> pm.path:
@@ -165,7 +172,8 @@ class PathsPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
         :return: the CWD the commands operates in
         """
-        return os.path.abspath(self.get_cwd())
+        # get_cwd is already absolute
+        return self.get_cwd()
 
     @pm.register_command.add("paths")
     def cd(self, *folder: pm.path, create_if_not_exists: bool = True) -> pm.path:
@@ -180,10 +188,11 @@ class PathsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         result = self.get_cwd()
         actual_folder = os.path.join(*folder)
         p = self.abs_path(actual_folder)
-        self._log_command(f"""cd into folder \"{p}\"""")
+        self._log_command("cd into folder \"%s\"", p)
+        # p is already absolute, so it is the new cwd
         self.set_cwd(p)
-        if not os.path.exists(self.get_cwd()) and create_if_not_exists:
-            os.makedirs(self.get_cwd(), exist_ok=True)
+        if create_if_not_exists and not os.path.exists(p):
+            os.makedirs(p, exist_ok=True)
         return result
 
     @pm.register_command.add("paths")
@@ -203,13 +212,14 @@ class PathsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return:
         """
 
-        try:
-            p = self.abs_path(folder)
-            self._log_command(f"Cd'ing into the \"latest\" directory in folder \"{p}\" according to criterion \"{folder_format}\"")
-            self._disable_log_command = True
+        p = self.abs_path(folder)
+        self._log_command("Cd'ing into the \"latest\" directory in folder \"%s\" according to criterion \"%s\"", p, folder_format)
+        with self._log_command_disabled():
             self.cd(folder)
 
-            folders = dict()
+            # we just need the "latest" folder, so we keep track only of the greatest value seen so far
+            latest_key = None
+            latest_folder = None
             for subfolder in self.files.ls_only_directories(p):
                 if not subfolder.startswith(prefix):
                     if error_if_mismatch:
@@ -218,24 +228,35 @@ class PathsPMakeupPlugin(pm.AbstractPmakeupPlugin):
                         continue
 
                 subfolder_id = subfolder[len(prefix):]
+                if folder_format == "semver2" and _SEMVER_PREFIX_RE.match(subfolder_id) is None:
+                    # not a semantic version: avoid parsing (and raising and catching an exception) if we can
+                    if error_if_mismatch:
+                        raise ValueError(f"Invalid version string: {subfolder_id!r}")
+                    continue
+                if folder_format == "number" and _INT_RE.fullmatch(subfolder_id) is None:
+                    if error_if_mismatch:
+                        raise ValueError(f"invalid literal for int() with base 10: {subfolder_id!r}")
+                    continue
                 try:
                     if folder_format == "semver2":
-                        folders[Version(subfolder_id)] = subfolder
+                        key = Version(subfolder_id)
                     elif folder_format == "number":
-                        folders[int(subfolder_id)] = subfolder
+                        key = int(subfolder_id)
                     else:
                         raise pm.InvalidScenarioPMakeupException(f"invalid folder_format \"{folder_format}\"")
-                except Exception as e:
+                except Exception:
                     if error_if_mismatch:
-                        raise e
+                        raise
                     else:
                         continue
 
-            # fetch the "latest" by fetching the greater value in "folders"
-            latest_folder = list(sorted(folders.keys()))[0]
-            self.cd(folders[latest_folder])
-        finally:
-            self._disable_log_command = False
+                if latest_key is None or key > latest_key:
+                    latest_key = key
+                    latest_folder = subfolder
+
+            if latest_folder is None:
+                raise pm.PMakeupException(f"Cannot find any folder in \"{p}\" compliant with prefix \"{prefix}\" and format \"{folder_format}\"")
+            self.cd(latest_folder)
 
 
 PathsPMakeupPlugin.autoregister()
@@ -1,9 +1,21 @@
+import functools
 import re
 from typing import Iterable
 
 import pmakeup as pm
 
 
+@functools.lru_cache(maxsize=256)
+def _compile(regex: str) -> "re.Pattern":
+    """
+    Compile a regex. Scripts tend to check many strings against the same regex, so we keep the latest ones compiled
+
+    :param regex: the regex to compile
+    :return: the compiled regex
+    """
+    return re.compile(regex)
+
+
 class StringsPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
     def _setup_plugin(self):
@@ -59,7 +71,7 @@ class StringsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param regex: the regex to check. The syntax is available at https://docs.python.org/3/library/re.html
         :return: true if such a substring can be found, false otherwise
         """
-        m = re.match(regex, string)
+        m = _compile(regex).match(string)
         return m is not None
 
     @pm.register_command.add("strings")
@@ -71,7 +83,7 @@ class StringsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param regex: the regex to check. The syntax is available at https://docs.python.org/3/library/re.html
         :return: true if such a substring can be found, false otherwise
         """
-        m = re.match(regex, string)
+        m = _compile(regex).search(string)
         return m is not None
 
     @pm.register_command.add("strings")
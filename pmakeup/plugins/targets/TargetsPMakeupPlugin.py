@@ -105,7 +105,7 @@ class TargetsPMakeupPlugin(pm.AbstractPmakeupPlugin):
             else:
                 # G.edges([0, 2])
                 # OutEdgeDataView([(0, 1), (2, 3)])
-                for sink in map(lambda x: x[1], out_edges):
+                for _, sink in out_edges:
                     perform_target(sink, self._model.available_targets[sink])
                 # we have satisfied all requirements. Perform this target
                 descriptor.function()
@@ -126,7 +126,7 @@ class TargetsPMakeupPlugin(pm.AbstractPmakeupPlugin):
                         f"Invalid target {target_name}. Available targets are {', '.join(self._model.available_targets.keys())}")
 
                 target_descriptor = self._model.available_targets[target_name]
-                self._log_command(f"Executing target \"{target_descriptor.name}\"")
+                self._log_command("Executing target \"%s\"", target_descriptor.name)
                 perform_target(target_descriptor.name, target_descriptor)
 
 
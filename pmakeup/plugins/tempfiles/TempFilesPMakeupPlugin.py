@@ -42,13 +42,26 @@ class TempFilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         return self.platform.create_temp_directory_with(directory_prefix)
 
     @pm.register_command.add("tempfiles")
-    def create_temp_file(self, directory: str, file_prefix: str = None, file_suffix: str = None, mode: str = "r",
+    def create_memfd(self, name: str, mode: str = "w+b", encoding: str = None) -> Any:
+        """
+        Create a temporary file living only in RAM (if the platform supports it). The function can be used as input of
+        a "with" statement. The file will be automatically removed at the end of the with.
+
+        :param name: a name of the file. Used only for debugging purposes
+        :param mode: how we will open the file. E.g., "w+", "w+b"
+        :param encoding: the encoding of the file
+        :return: the opened file. Its path (valid only in the pmakeup process) is available in the field "name"
+        """
+        return self.platform.create_memfd(name, mode=mode, encoding=encoding)
+
+    @pm.register_command.add("tempfiles")
+    def create_temp_file(self, directory: str = None, file_prefix: str = None, file_suffix: str = None, mode: str = "r",
                          encoding: str = "utf-8", readable_for_all: bool = False, executable_for_owner: bool = False,
                          executable_for_all: bool = False) -> pm.path:
         """
         Creates the file. You need to manually dispose of the file by yourself
 
-        :param directory: the directory where to put the file
+        :param directory: the directory where to put the file. If None, a RAM-backed directory is used if available
         :param file_prefix: a string that will be put at the beginning of the filename
         :param file_suffix: a string that will be put at the end of the filename
         :param mode: how we will open the file. E.g., "r", "w"
@@ -59,15 +72,30 @@ class TempFilesPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: the absolute path of the temp file
         """
 
-        self._log_command(f"Create a temporary file")
+        self._log_command("Create a temporary file")
         return self.platform.create_temp_file(
-            directory=directory,
+            directory=self.paths.abs_path(directory) if directory is not None else None,
             file_prefix=file_prefix,
             file_suffix=file_suffix,
             readable_for_all=readable_for_all,
             executable_for_owner=executable_for_owner,
-            executable_for_all=executable_for_all
+            executable_for_all=executable_for_all,
+            pool=True
         )
 
+    @pm.register_command.add("tempfiles")
+    def release_temp_file(self, file: pm.path) -> bool:
+        """
+        Tell that a file generated by create_temp_file is not needed anymore. The file may be reused by the next
+        create_temp_file call with the same parameters; otherwise it is removed
+
+        :param file: the temp file to release. If relative, it is relative to the CWD
+        :return: true if the file will be reused, false if it has been removed
+        :raise PMakeupException: if the file has not been generated by create_temp_file. The file is left untouched
+        """
+        p = self.paths.abs_path(file)
+        self._log_command("Release the temporary file %s", p)
+        return self.platform.release_temp_file(p)
+
 
 TempFilesPMakeupPlugin.autoregister()
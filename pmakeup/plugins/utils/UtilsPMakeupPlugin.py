@@ -1,9 +1,26 @@
+import itertools
 import re
-from typing import Any, Iterable, Tuple, List
+from typing import Any, Iterable, Tuple, List, Union
 
 import pmakeup as pm
 
 
+try:
+    from itertools import pairwise as _pairwise
+except ImportError:
+    # python < 3.10
+    def _pairwise(it: Iterable[Any]) -> Iterable[Tuple[Any, Any]]:
+        a, b = itertools.tee(it)
+        next(b, None)
+        return zip(a, b)
+
+
+_NON_SPACE_RE = re.compile(r"[^ ]")
+"""
+all the characters in a string which are not a space
+"""
+
+
 class UtilsPMakeupPlugin(pm.AbstractPmakeupPlugin):
 
     def _setup_plugin(self):
@@ -16,23 +33,23 @@ class UtilsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         return []
 
     @pm.register_command.add("utils")
-    def grep(self, lines: Iterable[str], regex: str, reverse_match: bool = False) -> Iterable[str]:
+    def grep(self, lines: Iterable[str], regex: Union[str, "re.Pattern"], reverse_match: bool = False) -> Iterable[str]:
         """
         Filter the lines fetched from terminal
 
         :param lines: the lines to fetch
-        :param regex: a python regex. If a line contains a substring which matches the given regex, the line is returned
+        :param regex: a python regex. If a line contains a substring which matches the given regex, the line is returned.
+            It can also be an already compiled regex (see re.compile), useful if you need to grep several times with
+            the same regex
         :param reverse_match: if True, we will return lines which do not match the pattern
         :return: lines compliant with the regex
         """
-        for line in lines:
-            m = re.search(regex, line)
-            if reverse_match:
-                if m is None:
-                    yield line
-            else:
-                if m is not None:
-                    yield line
+        # re.compile returns compiled regexes as they are
+        search = re.compile(regex).search
+        if reverse_match:
+            yield from (line for line in lines if search(line) is None)
+        else:
+            yield from (line for line in lines if search(line) is not None)
 
     @pm.register_command.add("utils")
     def get_column_of_table(self, table: List[List[str]], index: int) -> List[str]:
@@ -43,7 +60,7 @@ class UtilsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param index: index of the column to return. Starts from 0
         :return: the column requested
         """
-        return list(map(lambda x: x[index], table))
+        return [row[index] for row in table]
 
     @pm.register_command.add("utils")
     def get_column_of_table_by_name(self, table: List[List[str]], column_name: str) -> List[str]:
@@ -56,12 +73,10 @@ class UtilsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: the column requested
         """
         header = table[0]
-        column_index = None
-        for index, name in enumerate(header):
-            if name == column_name:
-                column_index = index
-                break
-        if column_index is None:
+        try:
+            # if a name is repeated, we return the first column having it
+            column_index = header.index(column_name)
+        except ValueError:
             raise pm.PMakeupException(f"Cannot find column named '{column_name}' in header: {', '.join(header)}")
 
         return self.get_column_of_table(table, column_index)
@@ -80,47 +95,28 @@ class UtilsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :return: list of lists of strings
         """
 
-        def is_column(index: int, lines: List[str]) -> bool:
-            column_found = True
-            # a column is found when in all lines the same character is " "
-            for line in lines:
-                # the char in index needs to be a whitespace for all lines
-                column_found = line[index] == " "
-                if not column_found:
-                    return False
-                # the char after index needs not to be a whitespace for all lines
-                if 0 < (index + 1) < len(line):
-                    column_found = line[index + 1] != " "
-                if not column_found:
-                    return False
-            return True
-
         column_index = [0]
         result = []
-        lines = list(
-            filter(
-                lambda x: len(x) > 0,
-                map(
-                    lambda x: x.strip(),
-                    table_str.split("\n")
-                )
-            )
-        )
-        min_length = min(map(lambda x: len(x), lines))
-        for index in range(min_length):
-            if is_column(index, lines):
-                column_index.append(index + 1)
+        lines = [x for x in map(str.strip, table_str.split("\n")) if x]
+        min_length = min(map(len, lines))
+        # a column starts after index when, in all lines, the char in index is " " and the char after it is not.
+        # We represent the spaces of each line as the bits of an integer (bit i is set iff line[i] is " "), so we
+        # check all the indices of a line at once
+        columns = (1 << min_length) - 1
+        for line in lines:
+            spaces = int(_NON_SPACE_RE.sub("0", line).replace(" ", "1")[::-1], 2)
+            columns &= spaces & ~(spaces >> 1)
+        while columns != 0:
+            lowest = columns & -columns
+            column_index.append(lowest.bit_length())
+            columns ^= lowest
         # append last column
         column_index.append(-1)
 
+        # the columns are the same for every line: compute the slices only once
+        slices = [slice(start, None if end == -1 else (end - 1)) for start, end in _pairwise(column_index)]
         for line in lines:
-            tmp = []
-            for (start, end) in self.pairs(column_index):
-                if end == -1:
-                    tmp.append(line[start:].strip())
-                else:
-                    tmp.append(line[start:(end - 1)].strip())
-            result.append(tmp)
+            result.append([line[column].strip() for column in slices])
 
         return result
 
@@ -134,13 +130,7 @@ class UtilsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param it: iterable whose sequence we need to generate
         :return: iterable of pairs
         """
-        previous = None
-        for x in it:
-            if previous is None:
-                previous = x
-            else:
-                yield previous, x
-                previous = x
+        return _pairwise(it)
 
     @pm.register_command.add("utils")
     def as_bool(self, v: Any) -> bool:
@@ -1,36 +1,97 @@
 import os
+import shutil
+import urllib.parse
 import urllib.request
-from typing import Iterable
+from typing import Iterable, Optional, BinaryIO
 
 import pmakeup as pm
 
 
+_DOWNLOAD_BUF = 1 << 20
+"""
+size of the chunks used to write a downloaded file on the disk
+"""
+
+
+def _save_stream(source: BinaryIO, dst: pm.path) -> None:
+    """
+    Write the content of a downloaded stream into a file
+
+    :param source: the stream to read
+    :param dst: absolute path of the file to create
+    """
+    # download in a side file: an interrupted download must not look like a complete file to ignore_if_file_exists
+    partial = dst + ".part"
+    try:
+        with open(partial, "wb") as f:
+            shutil.copyfileobj(source, f, length=_DOWNLOAD_BUF)
+        os.replace(partial, dst)
+    except BaseException:
+        if os.path.exists(partial):
+            os.unlink(partial)
+        raise
+
+
 class WebPMakeupPlugin(pm.AbstractPmakeupPlugin):
+
+    def __init__(self, model: "pm.PMakeupModel"):
+        super().__init__(model)
+        self._http: Optional["requests.Session"] = None
+        """
+        session used to download files. Created the first time we need it: it keeps the connections alive, so several
+        downloads from the same host do not perform the TCP and TLS handshakes again
+        """
+
     def _setup_plugin(self):
         pass
 
     def _teardown_plugin(self):
-        pass
+        if self._http is not None:
+            self._http.close()
+            self._http = None
 
     def _get_dependencies(self) -> Iterable[type]:
         return []
 
     @pm.register_command.add("wen")
-    def download_url(self, url: str, destination: pm.path = None, ignore_if_file_exists: bool = True) -> pm.path:
+    def download_url(self, url: str, destination: pm.path = None, ignore_if_file_exists: bool = True,
+                     timeout: Optional[float] = None) -> pm.path:
         """
         Download an artifact from internet
 
         :param url: the url where the file is lcoated
         :param destination: the folder where the file will be created
         :param ignore_if_file_exists: if true, we will not perform the download at all
+        :param timeout: seconds to wait for the server to respond before giving up. If None, we wait forever
         :return: path containing the downloaded item
         """
         dst = self.paths.abs_path(destination)
-        self._log_command(f"""Downloading {url} from internet into {dst}""")
-        if ignore_if_file_exists and os.path.exists(dst):
-            return dst
+        self._log_command("Downloading %s from internet into %s", url, dst)
+        if ignore_if_file_exists:
+            try:
+                os.stat(dst)
+                return dst
+            except FileNotFoundError:
+                pass
 
-        result, http_message = urllib.request.urlretrieve(url, dst)
-        return result
+        if urllib.parse.urlsplit(url).scheme.lower() in ("http", "https"):
+            if self._http is None:
+                # requests takes a while to import: pay for it only if the PMakefile downloads something
+                import requests
+                self._http = requests.Session()
+            with self._http.get(url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                # the server may have compressed the transfer (e.g., gzip): we want the file, not the encoded stream
+                response.raw.decode_content = True
+                _save_stream(response.raw, dst)
+        else:
+            # requests handles only http and https: let urllib deal with the other schemes (e.g., file or ftp)
+            if timeout is None:
+                response = urllib.request.urlopen(url)
+            else:
+                response = urllib.request.urlopen(url, timeout=timeout)
+            with response:
+                _save_stream(response, dst)
+        return dst
 
 WebPMakeupPlugin.autoregister()
@@ -314,7 +314,7 @@ class WindowsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param architecture: architecture of the registry to connect to
         :return: value associated to the item
         """
-        return (list(filter(lambda x: x[0] == item, self.get_registry_values(hkey, key, architecture=architecture)))[0])[1]
+        return [v for k, v, _ in self.get_registry_values(hkey, key, architecture=architecture) if k == item][0]
 
     @pm.register_command.add("windows registry")
     def has_registry_value(self, hkey: int, key: str, item: str, architecture: int = None) -> bool:
@@ -326,7 +326,7 @@ class WindowsPMakeupPlugin(pm.AbstractPmakeupPlugin):
         :param item: key-vaue pair that may or may not exists
         :return: true if the key-value does not exists in the given `key`
         """
-        return len(list(filter(lambda x: x[0] == item, self.get_registry_values(hkey, key, architecture=architecture)))) > 0
+        return any(k == item for k, _, _ in self.get_registry_values(hkey, key, architecture=architecture))
 
     @pm.register_command.add("windows registry")
     def has_registry_local_machine_value(self, key: str, item: str, architecture: int = None) -> bool:
@@ -113,6 +113,16 @@ class MyTestCase(unittest.TestCase):
         self.assertStdoutEquals("5, 6, 7", lambda: model.manage_pmakefile())
         os.unlink("Hello")
 
+    def test_remove_last_n_line_from_file(self):
+        model = pm.PMakeupModel()
+        model.input_string = """
+            write_lines(f"Hello", ["5", "6", "7", "8"])
+            echo(', '.join(map(str.strip, remove_last_n_line_from_file("Hello", 2))))
+            echo(', '.join(read_lines("Hello")))
+            """
+        self.assertStdoutEquals("8, 7\n5, 6", lambda: model.manage_pmakefile())
+        os.unlink("Hello")
+
     def test_append_string_at_end_of_file(self):
         model = pm.PMakeupModel()
         model.input_string = """
@@ -125,6 +135,17 @@ class MyTestCase(unittest.TestCase):
         self.assertStdoutEquals("5, 6, 7", lambda: model.manage_pmakefile())
         os.unlink("Hello")
 
+    def test_append_string_at_end_of_file_without_encoding(self):
+        model = pm.PMakeupModel()
+        model.input_string = """
+            remove_file("Hello")
+            append_string_at_end_of_file("Hello", 5, encoding=None)
+            append_strings_at_end_of_file("Hello", [6, 7], encoding=None)
+            echo(', '.join(read_lines("Hello", encoding=None)))
+            """
+        self.assertStdoutEquals("5, 6, 7", lambda: model.manage_pmakefile())
+        os.unlink("Hello")
+
     def test_copy_file(self):
         model = pm.PMakeupModel()
         model.input_string = """
@@ -202,6 +223,78 @@ class MyTestCase(unittest.TestCase):
         self.assertStdoutEquals("True\nTrue", lambda: model.manage_pmakefile())
         os.unlink("foo.txt")
 
+    def test_ls_only_files(self):
+        model = pm.PMakeupModel()
+        model.input_string = """
+            make_directories("temp_ls/foo")
+            create_empty_file("temp_ls/empty1.txt")
+            create_empty_file("temp_ls/empty2.txt")
+            echo(sorted(ls_only_files("temp_ls")))
+            echo(list(ls_only_directories("temp_ls")))
+            remove_tree("temp_ls")
+        """
+        self.assertStdoutEquals("['empty1.txt', 'empty2.txt']\n['foo']", lambda: model.manage_pmakefile())
+
+    def test_ls_recursive_glob(self):
+        model = pm.PMakeupModel()
+        model.input_string = """
+            make_directories("temp_glob/foo/bar")
+            create_empty_file("temp_glob/a.py")
+            create_empty_file("temp_glob/foo/b.txt")
+            create_empty_file("temp_glob/foo/bar/c.py")
+            echo(sorted(get_relative_path_wrt(x, cwd()) for x in ls_recursive_glob("**/*.py", "temp_glob")))
+            remove_tree("temp_glob")
+        """
+        self.assertStdoutEquals(str(sorted([
+            os.path.join("temp_glob", "a.py"),
+            os.path.join("temp_glob", "foo", "bar", "c.py")
+        ])), lambda: model.manage_pmakefile())
+
+    def test_move_tree_missing_source(self):
+        model = pm.PMakeupModel()
+        model.input_string = """
+            try:
+                move_tree("temp_not_existing", "temp_move/foo/bar")
+            except Exception as e:
+                echo(type(e).__name__)
+            echo(is_directory_exists("temp_move"))
+        """
+        self.assertStdoutEquals("InvalidScenarioPMakeupException\nFalse", lambda: model.manage_pmakefile())
+
+    def test_release_temp_file(self):
+        model = pm.PMakeupModel()
+        model.input_string = """
+            make_directories("temp_pool")
+            a = create_temp_file("temp_pool")
+            write_file(a, "hello")
+            echo(release_temp_file(a))
+            b = create_temp_file("temp_pool")
+            echo(a == b)
+            echo(is_file_empty(b))
+            remove_tree("temp_pool")
+        """
+        self.assertStdoutEquals("True\nTrue\nTrue", lambda: model.manage_pmakefile())
+
+    def test_release_temp_file_twice(self):
+        model = pm.PMakeupModel()
+        model.input_string = """
+            make_directories("temp_pool")
+            a = create_temp_file("temp_pool")
+            release_temp_file(a)
+            release_temp_file(a)
+            b = create_temp_file("temp_pool")
+            c = create_temp_file("temp_pool")
+            echo(b == c)
+            write_file("temp_pool/not_temp.txt", "hello")
+            try:
+                release_temp_file("temp_pool/not_temp.txt")
+            except Exception:
+                pass
+            echo(is_file_exists("temp_pool/not_temp.txt"))
+            remove_tree("temp_pool")
+        """
+        self.assertStdoutEquals("False\nTrue", lambda: model.manage_pmakefile())
+
     def test_cd(self):
         model = pm.PMakeupModel()
         model.input_string = """
@@ -358,6 +451,31 @@ class MyTestCase(unittest.TestCase):
         """
         self.assertStdoutEquals("Hello", lambda: model.manage_pmakefile())
 
+    def test_include_files(self):
+        model = pm.PMakeupModel()
+        model.input_string = """
+            write_file("test-temp-1.py", "echo(\\"Hello\\")")
+            write_file("test-temp-2.py", "echo(\\"world\\")")
+            include_files(["test-temp-1.py", "test-temp-2.py"])
+            remove_file("test-temp-1.py")
+            remove_file("test-temp-2.py")
+        """
+        self.assertStdoutEquals("Hello\nworld", lambda: model.manage_pmakefile())
+
+    def test_include_files_generated_by_previous_ones(self):
+        model = pm.PMakeupModel()
+        model.input_string = """
+            write_file("test-temp-1.py", "write_file(\\"test-temp-2.py\\", \\"echo(\\\\\\"world\\\\\\")\\", overwrite=True)")
+            write_file("test-temp-2.py", "echo(\\"old\\")")
+            write_file("test-temp-3.py", "write_file(\\"test-temp-4.py\\", \\"echo(\\\\\\"Hello\\\\\\")\\")")
+            include_files(["test-temp-3.py", "test-temp-4.py", "test-temp-1.py", "test-temp-2.py"])
+            remove_file("test-temp-1.py")
+            remove_file("test-temp-2.py")
+            remove_file("test-temp-3.py")
+            remove_file("test-temp-4.py")
+        """
+        self.assertStdoutEquals("Hello\nworld", lambda: model.manage_pmakefile())
+
     def test_commands(self):
         model = pm.PMakeupModel()
         model.input_string = """
@@ -459,6 +577,21 @@ class MyTestCase(unittest.TestCase):
 
         os.unlink("pmakeup-cache.json")
 
+    def test_binary_cache_usage(self):
+        model = pm.PMakeupModel()
+        model.pmake_cache_format = "binary"
+        model.input_string = """
+            if has_variable_in_cache("foo"):
+                echo(get_variable_in_cache("foo"))
+            else:
+                set_variable_in_cache("foo", "bar")
+                echo("not found")
+        """
+        self.assertStdoutEquals("not found", lambda: model.manage_pmakefile())
+        self.assertStdoutEquals("bar", lambda: model.manage_pmakefile())
+
+        os.unlink("pmakeup-cache.bin")
+
     def test_get_absolute_file_till_root_01(self):
         model = pm.PMakeupModel()
         model.input_string = """